@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+API 부하 테스트
+
+임시 DB에 멘토/멘티를 채운 뒤 main.app 을 같은 프로세스(ASGI transport) 또는 uvicorn 으로 띄우고
+다음 시나리오를 차례로 실행해 엔드포인트별 p50/p95/p99 지연 시간과 초당 요청 수를 보고합니다.
+
+- login: 동시 로그인 폭주 (bcrypt 포함)
+- browse: 멘토 목록 페이지를 넘기며 각 멘토의 썸네일 이미지 요청, 두 번째부터는 ETag 재검증
+- search: 스킬 필터와 자유 검색어로 멘토 검색
+- match: 매칭 요청 생성/수락/거절/취소 경쟁
+- overload: 동시성의 4배로 로그인을 쏟아붓는 동안 /api/me 지연 시간 측정 (거절되면 Retry-After 만큼 쉬고 재시도)
+
+429/503 응답은 오류가 아니라 부하 차단(shed)으로 따로 셉니다. 한 주소와 몇 개의 토큰이 여러 사용자를
+대신하므로 요청 속도 제한(RATE_LIMIT_*)을 켠 채로 돌리면 대부분 429 가 됩니다.
+
+결과는 --output 으로 JSON 저장하고, --baseline 으로 이전 결과와 비교해 p95 지연이나
+처리량이 --tolerance 이상 나빠진 엔드포인트가 있으면 종료 코드 1을 반환합니다.
+
+    python benchmarks/load_test.py --output load.json
+    python benchmarks/load_test.py --server uvicorn --baseline load_baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    import httpx
+except ImportError:
+    sys.exit("load_test.py needs httpx: pip install httpx")
+
+SCENARIOS = ("login", "browse", "search", "match", "overload")
+SHED_STATUSES = ("429", "503")  # turned away by admission control, not failures
+PASSWORD = "password123"
+MIN_P95_DELTA_MS = 1.0  # smaller p95 changes are noise, whatever the ratio
+MIN_SAMPLES = 20  # endpoints hit fewer times than this aren't compared
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Latencies and status codes per endpoint label for one scenario"""
+
+    def __init__(self, client: "httpx.AsyncClient"):
+        self.client = client
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    async def request(self, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.statuses[label][type(e).__name__] += 1
+            return None
+        self.latencies[label].append(time.perf_counter() - started)
+        self.statuses[label][str(response.status_code)] += 1
+        return response
+
+    def report(self, seconds: float) -> dict:
+        endpoints = {}
+        for label in sorted(self.statuses):
+            values = sorted(self.latencies[label])
+            count = sum(self.statuses[label].values())
+            endpoints[label] = {
+                "count": count,
+                "errors": sum(n for status, n in self.statuses[label].items()
+                              if status[0] not in "234" and status not in SHED_STATUSES),
+                "shed": sum(n for status, n in self.statuses[label].items() if status in SHED_STATUSES),
+                "rps": round(count / seconds, 1) if seconds else 0.0,
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "statuses": dict(self.statuses[label]),
+            }
+        return {"seconds": round(seconds, 2), "endpoints": endpoints}
+
+
+def auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def run_actors(actor, concurrency: int, seconds: float):
+    deadline = time.perf_counter() + seconds
+    rng = random.Random(1)
+
+    async def loop(n):
+        while time.perf_counter() < deadline:
+            await actor(rng, n)
+
+    await asyncio.gather(*[loop(n) for n in range(concurrency)])
+
+
+async def scenario_login(rec: Recorder, data: dict, args):
+    emails = iter(data["mentee_emails"] * (args.logins // len(data["mentee_emails"]) + 1))
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def login(email):
+        async with semaphore:
+            await rec.request("POST /api/login", "POST", "/api/login", json={"email": email, "password": PASSWORD})
+
+    await asyncio.gather(*[login(next(emails)) for _ in range(args.logins)])
+
+
+async def scenario_browse(rec: Recorder, data: dict, args):
+    etags = {}
+
+    async def actor(rng, n):
+        token = data["mentee_tokens"][n % len(data["mentee_tokens"])]
+        url = "/api/mentors?limit=20"
+        for _ in range(3):
+            response = await rec.request("GET /api/mentors", "GET", url, headers=auth(token))
+            if response is None or response.status_code != 200:
+                return
+            for mentor in response.json():
+                image_url = f"/api/images/mentor/{mentor['id']}?size=64&format=webp"
+                headers = auth(token)
+                if image_url in etags:
+                    headers["If-None-Match"] = etags[image_url]
+                image = await rec.request("GET /api/images/{role}/{id}", "GET", image_url, headers=headers)
+                if image is not None and "etag" in image.headers:
+                    etags[image_url] = image.headers["etag"]
+            if "x-next-cursor" not in response.headers:
+                return
+            url = f"/api/mentors?limit=20&cursor={response.headers['x-next-cursor']}"
+
+    await run_actors(actor, args.concurrency, args.seconds)
+
+
+async def scenario_search(rec: Recorder, data: dict, args):
+    queries = ["skill=React", "skill=Python,Go&skillMatch=any", "skill=Rust,AWS", "q=mentor", "q=개발자",
+               "q=mentor&skill=Kubernetes", "orderBy=name&limit=50", "orderBy=skill&limit=50"]
+
+    async def actor(rng, n):
+        token = data["mentee_tokens"][n % len(data["mentee_tokens"])]
+        query = rng.choice(queries)
+        await rec.request(f"GET /api/mentors?{query}", "GET", f"/api/mentors?{query}", headers=auth(token))
+
+    await run_actors(actor, args.concurrency, args.seconds)
+
+
+async def scenario_match(rec: Recorder, data: dict, args):
+    # A few popular mentors so creates and accepts actually contend
+    mentors = data["mentor_ids"][:max(2, args.concurrency // 2)]
+
+    async def actor(rng, n):
+        roll = rng.random()
+        if roll < 0.4:
+            mentee = rng.randrange(len(data["mentee_ids"]))
+            await rec.request("POST /api/match-requests", "POST", "/api/match-requests",
+                              headers=auth(data["mentee_tokens"][mentee]),
+                              json={"mentorId": rng.choice(mentors), "menteeId": data["mentee_ids"][mentee], "message": "부탁드립니다"})
+        elif roll < 0.75:
+            token = data["mentor_tokens"][rng.choice(mentors)]
+            response = await rec.request("GET /api/match-requests/incoming", "GET",
+                                         "/api/match-requests/incoming?status=pending&limit=20", headers=auth(token))
+            if response is not None and response.status_code == 200 and response.json():
+                request_id = rng.choice(response.json())["id"]
+                action = "accept" if rng.random() < 0.6 else "reject"
+                await rec.request(f"PUT /api/match-requests/{{id}}/{action}", "PUT",
+                                  f"/api/match-requests/{request_id}/{action}", headers=auth(token))
+        else:
+            token = data["mentee_tokens"][rng.randrange(len(data["mentee_tokens"]))]
+            response = await rec.request("GET /api/match-requests/outgoing", "GET",
+                                         "/api/match-requests/outgoing?status=pending,accepted", headers=auth(token))
+            if response is not None and response.status_code == 200 and response.json():
+                await rec.request("DELETE /api/match-requests/{id}", "DELETE",
+                                  f"/api/match-requests/{response.json()[0]['id']}", headers=auth(token))
+
+    await run_actors(actor, args.concurrency, args.seconds)
+
+
+async def scenario_overload(rec: Recorder, data: dict, args):
+    async def login(rng, n):
+        response = await rec.request("POST /api/login", "POST", "/api/login",
+                                     json={"email": rng.choice(data["mentee_emails"]), "password": PASSWORD})
+        if response is not None and str(response.status_code) in SHED_STATUSES:
+            # Well-behaved clients wait as told instead of hammering the server
+            await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+
+    async def me(rng, n):
+        token = data["mentee_tokens"][n % len(data["mentee_tokens"])]
+        await rec.request("GET /api/me", "GET", "/api/me", headers=auth(token))
+
+    await asyncio.gather(run_actors(login, args.concurrency * 4, args.seconds),
+                         run_actors(me, args.concurrency, args.seconds))
+
+
+def seed(args) -> dict:
+    """Fill the scratch database through import_data and mint tokens for every user"""
+    import main
+    import import_data
+    from migrate_images import backfill_image_variants
+    from sqlalchemy import select
+
+    main.prepare_database()
+    hashes = import_data.PasswordHashes(1, PASSWORD)
+    images = import_data.generate_images(20)
+    import_data.import_users(import_data.generate_users(args.mentors, args.mentees, images, "example.com", 1), hashes, 5000)
+    backfill_image_variants()
+
+    with main.engine.connect() as conn:
+        users = conn.execute(select(main.User.id, main.User.email, main.User.name, main.User.role)).all()
+    data = {"mentor_ids": [], "mentor_tokens": {}, "mentee_ids": [], "mentee_tokens": [], "mentee_emails": []}
+    for user in users:
+        token = main.create_access_token(data={"user_id": user.id, "name": user.name, "email": user.email, "role": user.role})
+        if user.role == "mentor":
+            data["mentor_ids"].append(user.id)
+            data["mentor_tokens"][user.id] = token
+        else:
+            data["mentee_ids"].append(user.id)
+            data["mentee_tokens"].append(token)
+            data["mentee_emails"].append(user.email)
+    main.engine.dispose()
+    return data
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run(args, data: dict) -> dict:
+    server = None
+    if args.server == "uvicorn":
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR
+        )
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60,
+                                   limits=httpx.Limits(max_connections=args.concurrency * 5))  # overload runs 5x
+        for _ in range(100):
+            try:
+                await client.get("/docs")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    else:
+        import main
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://testserver", timeout=60)
+
+    results = {}
+    try:
+        for name in args.scenarios:
+            rec = Recorder(client)
+            started = time.perf_counter()
+            await globals()[f"scenario_{name}"](rec, data, args)
+            results[name] = rec.report(time.perf_counter() - started)
+    finally:
+        await client.aclose()
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def print_results(results: dict):
+    print(f"{'endpoint':<48} {'count':>7} {'err':>5} {'shed':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for scenario, result in results.items():
+        print(f"[{scenario}] {result['seconds']}s")
+        for label, stats in result["endpoints"].items():
+            print(f"  {label:<46} {stats['count']:>7} {stats['errors']:>5} {stats.get('shed', 0):>5} {stats['rps']:>8} "
+                  f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}")
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """Endpoints whose p95 latency or throughput got worse than the baseline by more than tolerance"""
+    regressions = []
+    if baseline.get("config") != current["config"]:
+        print("Warning: baseline was recorded with a different configuration; comparing anyway")
+    for scenario, result in current["scenarios"].items():
+        base_endpoints = baseline.get("scenarios", {}).get(scenario, {}).get("endpoints", {})
+        for label, stats in result["endpoints"].items():
+            base = base_endpoints.get(label)
+            if not base or min(base["count"], stats["count"]) < MIN_SAMPLES:
+                continue
+            if stats["p95_ms"] > base["p95_ms"] * (1 + tolerance) and stats["p95_ms"] - base["p95_ms"] > MIN_P95_DELTA_MS:
+                regressions.append(f"[{scenario}] {label}: p95 {base['p95_ms']} -> {stats['p95_ms']} ms")
+            if stats["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(f"[{scenario}] {label}: {base['rps']} -> {stats['rps']} req/s")
+            if stats["errors"] > base["errors"]:
+                regressions.append(f"[{scenario}] {label}: errors {base['errors']} -> {stats['errors']}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--mentors", type=int, default=2000)
+    parser.add_argument("--mentees", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients per scenario")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each timed scenario")
+    parser.add_argument("--logins", type=int, default=100, help="logins in the login storm")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with results saved earlier by --output")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing (default: 0.25)")
+    args = parser.parse_args()
+
+    # main.py reads its configuration at import time, and uvicorn workers inherit it
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='load-test-'), 'load.db')}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ.setdefault("ARCHIVE_INTERVAL_SECONDS", "0")
+
+    data = seed(args)
+    results = asyncio.run(run(args, data))
+    print_results(results)
+
+    config = {key: getattr(args, key) for key in ("server", "workers", "mentors", "mentees", "concurrency",
+                                                  "seconds", "logins", "bcrypt_rounds")}
+    config.update(python=platform.python_version(), cpus=os.cpu_count())
+    current = {"config": config, "scenarios": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2, ensure_ascii=False)
+
+    failures = [f"[{scenario}] {label}: {stats['errors']} errors"
+                for scenario, result in results.items() for label, stats in result["endpoints"].items()
+                if stats["errors"] and not args.baseline]
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += compare(json.load(f), current, args.tolerance)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+매칭 요청 동시성 스트레스 테스트
+
+여러 프로세스(각각 독립된 writer 큐를 가진 워커)가 같은 SQLite 파일에 대해
+매칭 요청 생성/수락/거절/취소를 동시에 실행한 뒤 아래 불변식을 검사합니다.
+
+- 멘토당 수락된 요청은 최대 1개
+- 멘티당 대기 중인 요청은 최대 1개
+- 경합 때문에 500 오류가 발생하지 않음
+
+--without-indexes 를 주면 부분 유니크 인덱스를 지운 상태로 실행해
+조건부 SQL 문만으로도 불변식이 지켜지는지 확인합니다.
+
+    python benchmarks/match_races.py --workers 4 --tasks 16 --seconds 5
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def load_main(db_path: str):
+    # main.py binds its engines to SQLALCHEMY_DATABASE_URL at import time
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{db_path}"
+    import main
+    return main
+
+
+def seed(db_path: str, mentors: int, mentees: int, without_indexes: bool):
+    main = load_main(db_path)
+    from sqlalchemy import insert
+
+    main.prepare_database()
+    with main.engine.begin() as conn:
+        conn.execute(insert(main.User), [
+            {"email": f"mentor{i}@example.com", "hashed_password": "x", "name": f"Mentor {i}",
+             "role": "mentor", "bio": "", "skills": "[]"}
+            for i in range(mentors)
+        ] + [
+            {"email": f"mentee{i}@example.com", "hashed_password": "x", "name": f"Mentee {i}",
+             "role": "mentee", "bio": "", "skills": None}
+            for i in range(mentees)
+        ])
+        if without_indexes:
+            conn.exec_driver_sql("DROP INDEX ux_match_requests_mentor_accepted")
+            conn.exec_driver_sql("DROP INDEX ux_match_requests_mentee_pending")
+    main.engine.dispose()
+
+
+async def run_worker(main, worker_seed: int, mentors: int, mentees: int, tasks: int, seconds: float):
+    from fastapi import HTTPException
+    from sqlalchemy import select
+
+    rng = random.Random(worker_seed)
+    mentor_ids = list(range(1, mentors + 1))
+    mentee_ids = list(range(mentors + 1, mentors + mentees + 1))
+
+    def token_user(user_id: int, role: str):
+        return main.TokenUser({"sub": str(user_id), "role": role})
+
+    outcomes = Counter()
+    deadline = time.perf_counter() + seconds
+
+    async def call(action: str, handler, arg, user):
+        async with main.AsyncSessionLocal() as db:
+            try:
+                await handler(arg, db=db, current_user=user)
+                outcomes[f"{action} 200"] += 1
+            except HTTPException as e:
+                outcomes[f"{action} {e.status_code}"] += 1
+            finally:
+                await db.commit()
+
+    async def pending_for(column, user_id: int, statuses):
+        async with main.AsyncSessionLocal() as db:
+            return (await db.scalars(select(main.MatchRequest.id).where(
+                column == user_id, main.MatchRequest.status.in_(statuses)
+            ))).all()
+
+    async def actor():
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            if roll < 0.4:
+                mentee = rng.choice(mentee_ids)
+                request = main.MatchRequestCreate(mentorId=rng.choice(mentor_ids), menteeId=mentee, message="race")
+                await call("create", main.create_match_request, request, token_user(mentee, "mentee"))
+                continue
+
+            if roll < 0.8:
+                mentor = rng.choice(mentor_ids)
+                ids = await pending_for(main.MatchRequest.mentor_id, mentor, ["pending"])
+                if ids:
+                    handler = main.accept_match_request if roll < 0.7 else main.reject_match_request
+                    action = "accept" if roll < 0.7 else "reject"
+                    await call(action, handler, rng.choice(ids), token_user(mentor, "mentor"))
+                continue
+
+            mentee = rng.choice(mentee_ids)
+            ids = await pending_for(main.MatchRequest.mentee_id, mentee, ["pending", "accepted"])
+            if ids:
+                await call("cancel", main.cancel_match_request, rng.choice(ids), token_user(mentee, "mentee"))
+
+    await asyncio.gather(*[actor() for _ in range(tasks)])
+    await main.async_engine.dispose()
+    return outcomes
+
+
+def worker(args):
+    db_path, worker_seed, mentors, mentees, tasks, seconds = args
+    main = load_main(db_path)
+    return asyncio.run(run_worker(main, worker_seed, mentors, mentees, tasks, seconds))
+
+
+def check_invariants(db_path: str) -> list:
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    violations = []
+    for label, sql in (
+        ("mentors with more than one accepted request",
+         "SELECT mentor_id, COUNT(*) FROM match_requests WHERE status = 'accepted' GROUP BY mentor_id HAVING COUNT(*) > 1"),
+        ("mentees with more than one pending request",
+         "SELECT mentee_id, COUNT(*) FROM match_requests WHERE status = 'pending' GROUP BY mentee_id HAVING COUNT(*) > 1"),
+    ):
+        rows = conn.execute(sql).fetchall()
+        if rows:
+            violations.append(f"{label}: {rows}")
+    conn.close()
+    return violations
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="processes sharing the database")
+    parser.add_argument("--tasks", type=int, default=16, help="concurrent actors per process")
+    parser.add_argument("--mentors", type=int, default=5)
+    parser.add_argument("--mentees", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--without-indexes", action="store_true",
+                        help="drop the partial unique indexes and rely on the conditional statements alone")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="match-races-"), "races.db")
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        pool.apply(seed, (db_path, args.mentors, args.mentees, args.without_indexes))
+
+    print(f"workers={args.workers} tasks={args.tasks} mentors={args.mentors} mentees={args.mentees} "
+          f"seconds={args.seconds} indexes={'off' if args.without_indexes else 'on'}")
+    jobs = [(db_path, n, args.mentors, args.mentees, args.tasks, args.seconds) for n in range(args.workers)]
+    with ctx.Pool(args.workers) as pool:
+        outcomes = sum(pool.map(worker, jobs), Counter())
+
+    for key in sorted(outcomes):
+        print(f"  {key:<12} {outcomes[key]}")
+
+    violations = check_invariants(db_path)
+    errors = sum(count for key, count in outcomes.items() if key.endswith(" 500"))
+    for violation in violations:
+        print(f"FAIL {violation}")
+    if errors:
+        print(f"FAIL {errors} requests ended in a 500")
+    if violations or errors:
+        sys.exit(1)
+    print("OK invariants hold")
+
+
+if __name__ == "__main__":
+    main_cli()
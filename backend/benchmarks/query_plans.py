@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+쿼리 플랜 회귀 검사
+
+샘플 데이터를 넣은 임시 DB에서 주요 API를 호출하며 실행된 SQL을 모두 수집하고,
+각 문장에 EXPLAIN QUERY PLAN을 실행해 인덱스 없이 테이블 전체를 훑는(SCAN) 쿼리가
+있으면 실패합니다. 새 쿼리를 추가했다면 이 스크립트로 인덱스를 타는지 확인하세요.
+
+    python benchmarks/query_plans.py            # 문제 있는 플랜만 출력
+    python benchmarks/query_plans.py --verbose  # 모든 쿼리와 플랜 출력
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="query-plans-")
+DB_PATH = os.path.join(_scratch, "plans.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import event, insert
+
+import main
+
+# Not table scans: the FTS5 table is searched through its own index, and
+# INSERT ... SELECT without FROM reads a single constant row
+ALLOWED_SCANS = {"mentor_search", "CONSTANT"}
+SCAN_PATTERN = re.compile(r"\bSCAN (?:TABLE )?(\w+)")
+MENTORS, MENTEES, REQUESTS = 300, 300, 2000
+
+
+def seed():
+    main.prepare_database()
+    skills = ["React", "Python", "Go", "Vue", "Rust", "Java"]
+    with main.engine.begin() as conn:
+        conn.execute(insert(main.User), [
+            {"email": f"mentor{i}@example.com", "hashed_password": "x", "name": f"Mentor {i}", "role": "mentor",
+             "bio": "Mentor bio", "skills": json.dumps(skills[i % 6:i % 6 + 2])}
+            for i in range(MENTORS)
+        ] + [
+            {"email": f"mentee{i}@example.com", "hashed_password": "x", "name": f"Mentee {i}", "role": "mentee",
+             "bio": "", "skills": None}
+            for i in range(MENTEES)
+        ])
+        conn.execute(insert(main.MentorSkill), [
+            row for i in range(MENTORS) for row in main.mentor_skill_rows(i + 1, skills[i % 6:i % 6 + 2])
+        ])
+        conn.execute(insert(main.MatchRequest), [
+            {"mentor_id": 1 + i % MENTORS, "mentee_id": MENTORS + 1 + i % MENTEES, "message": "hi",
+             "status": "rejected" if i % 3 else "cancelled"}
+            for i in range(REQUESTS)
+        ])
+    main.install_mentor_search(main.engine)
+
+
+async def call(method: str, path: str, token: str = None, body: dict = None):
+    """Minimal in-process ASGI request, so the real routing and dependencies run"""
+    path, _, query = path.partition("?")
+    headers = [(b"content-type", b"application/json")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": headers, "client": ("127.0.0.1", 0), "server": ("testserver", 80), "root_path": "",
+    }
+    payload = json.dumps(body).encode() if body is not None else b""
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await main.app(scope, receive, send)
+    if response["status"] >= 500:
+        raise RuntimeError(f"{method} {path} -> {response['status']}: {response['body'][:200]!r}")
+    return response["status"], response["body"]
+
+
+def token_for(user_id: int, role: str) -> str:
+    return main.create_access_token(data={"user_id": user_id, "name": f"user {user_id}",
+                                          "email": f"{user_id}@example.com", "role": role})
+
+
+async def exercise():
+    mentor, mentee, other_mentee = token_for(1, "mentor"), token_for(MENTORS + 1, "mentee"), token_for(MENTORS + 2, "mentee")
+    await call("GET", "/api/me", mentee)
+    await call("PUT", "/api/profile", mentor, {"id": 1, "name": "Mentor 1", "role": "mentor", "bio": "Updated",
+                                               "skills": ["React", "Python"]})
+    for query in ("", "?orderBy=name", "?orderBy=skill", "?skill=react", "?skill=react,go&skillMatch=any",
+                  "?skill=react,python&skillMatch=all", "?q=mentor", "?q=mentor&orderBy=rank", "?limit=20",
+                  "?fields=name,skills&limit=20"):
+        status, body = await call("GET", f"/api/mentors{query}", mentee)
+    status, body = await call("GET", "/api/mentors?limit=20", mentee)
+    main.mentor_directory_cache._entries.clear()
+    await call("GET", f"/api/mentors?limit=20&orderBy=name", mentee)
+    await call("GET", "/api/images/mentor/1", mentee)
+    await call("GET", "/api/images/mentor/2?size=64&format=webp", mentee)
+
+    status, body = await call("POST", "/api/match-requests", mentee, {"mentorId": 1, "menteeId": MENTORS + 1, "message": "hi"})
+    first = json.loads(body)["id"]
+    await call("POST", "/api/match-requests", mentee, {"mentorId": 2, "menteeId": MENTORS + 1, "message": "again"})
+    status, body = await call("POST", "/api/match-requests", other_mentee, {"mentorId": 1, "menteeId": MENTORS + 2, "message": "hi"})
+    second = json.loads(body)["id"]
+    await call("GET", "/api/match-requests/incoming", mentor)
+    await call("GET", "/api/match-requests/outgoing", mentee)
+    for query in ("?status=pending", "?limit=20", "?since=2000-01-01T00:00:00&limit=20", "?status=pending,accepted&since=2000-01-01",
+                  "?embed=profile&limit=20"):
+        await call("GET", f"/api/match-requests/incoming{query}", mentor)
+        await call("GET", f"/api/match-requests/outgoing{query}", mentee)
+    await call("GET", "/api/mentors/recommend?skills=react,go,rust", mentee)
+    await call("GET", f"/api/users?ids=1,2,3,{MENTORS + 1}", mentee)
+    await call("GET", f"/api/users?ids=1,{MENTORS + 1},{MENTORS + 2},{MENTORS + 3}", mentor)
+    await call("PUT", f"/api/match-requests/{first}/accept", mentor)
+    await call("PUT", f"/api/match-requests/{second}/accept", mentor)
+    await call("PUT", f"/api/match-requests/{second}/reject", mentor)
+    await call("DELETE", f"/api/match-requests/{first}", mentee)
+    await call("DELETE", f"/api/match-requests/{first}", mentee)
+    await main.MatchRequestArchiver(after_days=-1, interval=0, batch_size=500).run_once()
+    for query in ("?archived=true", "?archived=true&since=2000-01-01&limit=20", "?archived=true&embed=profile"):
+        await call("GET", f"/api/match-requests/incoming{query}", mentor)
+        await call("GET", f"/api/match-requests/outgoing{query}", mentee)
+    await main.async_engine.dispose()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    seed()
+    statements = {}
+
+    @event.listens_for(main.async_engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+            statements.setdefault(statement, parameters[0] if executemany else parameters)
+
+    asyncio.run(exercise())
+
+    conn = sqlite3.connect(DB_PATH)
+    failures = 0
+    for statement, parameters in statements.items():
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        scans = [line for line in plan
+                 if (match := SCAN_PATTERN.search(line)) and match.group(1) not in ALLOWED_SCANS]
+        if scans:
+            failures += 1
+        if scans or args.verbose:
+            print(("FAIL " if scans else "ok   ") + " ".join(statement.split())[:300])
+            for line in plan:
+                print(f"       {line}")
+    conn.close()
+
+    print(f"{len(statements)} statements checked, {failures} with full table scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+멘토 추천 인덱스 벤치마크
+
+멘토 10만 명(기술 스택 300종, 자주 쓰이는 기술일수록 많이 등장)을 넣은 임시 DB에서
+MentorIndex를 만들고 GET /api/mentors/recommend 의 인덱스 조회 시간과 HTTP 요청 전체 시간을
+측정합니다. 모든 조회 결과를 단순 전체 탐색 결과와 비교해 다르면 실패합니다.
+
+    python benchmarks/recommend.py
+    python benchmarks/recommend.py --mentors 100000 --queries 500
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="recommend-")
+DB_PATH = os.path.join(_scratch, "recommend.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import insert
+
+import main
+
+VOCABULARY = [f"Skill{i}" for i in range(300)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]  # Zipf-like popularity
+LIMIT = 20
+
+
+def seed(mentors: int, rng: random.Random):
+    main.prepare_database()
+    users = [
+        {"id": i, "email": f"mentor{i}@example.com", "hashed_password": "x", "name": f"Mentor {i}", "role": "mentor",
+         "bio": "", "skills": json.dumps(sorted(set(rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(1, 6)))))}
+        for i in range(1, mentors + 1)
+    ]
+    mentee_id = mentors + 1
+    users.append({"id": mentee_id, "email": "mentee@example.com", "hashed_password": "x", "name": "Mentee",
+                  "role": "mentee", "bio": "", "skills": None})
+    # Every tenth mentor has an accepted mentee and must never be recommended
+    accepted = [{"mentor_id": i, "mentee_id": mentee_id, "message": "hi", "status": "accepted"}
+                for i in range(10, mentors + 1, 10)]
+    with main.engine.begin() as conn:
+        conn.execute(insert(main.User), users)
+        conn.execute(insert(main.MatchRequest), accepted)
+    return users[:-1], {row["mentor_id"] for row in accepted}, mentee_id
+
+
+def brute_force(users, taken: set, keys: list) -> list:
+    wanted = set(keys)
+    scored = []
+    for user in users:
+        if user["id"] in taken:
+            continue
+        overlap = len({main.normalize_skill(skill) for skill in json.loads(user["skills"])} & wanted)
+        if overlap:
+            scored.append((-overlap, -user["id"]))
+    return [(-negative_id, -negative) for negative, negative_id in sorted(scored)[:LIMIT]]
+
+
+async def call(path: str, token: str):
+    """Minimal in-process ASGI GET, so routing, dependencies and serialization all run"""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("testserver", 80), "root_path": "",
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await main.app(scope, receive, send)
+    if response["status"] != 200:
+        raise RuntimeError(f"GET {path} -> {response['status']}: {response['body'][:200]!r}")
+    return json.loads(response["body"])
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(mentors: int, queries: int, seed_value: int):
+    rng = random.Random(seed_value)
+    users, taken, mentee_id = seed(mentors, rng)
+    token = main.create_access_token(data={"user_id": mentee_id, "name": "Mentee",
+                                           "email": "mentee@example.com", "role": "mentee"})
+    main.mentor_index.start()
+    await main.mentor_index._rebuild
+    stats = main.mentor_index.stats()
+    print(f"mentors={stats['mentors']} available={stats['available']} skills={stats['skills']} "
+          f"build={stats['last_rebuild_ms']:.0f} ms")
+
+    problems = []
+    print(f"{'skills':>6} {'index p50 us':>13} {'index p99 us':>13} {'http p50 ms':>12} {'http p99 ms':>12}")
+    for size in (1, 3, 5, 10):
+        index_times, http_times = [], []
+        for _ in range(queries):
+            skills = rng.sample(VOCABULARY, size)
+            keys = [main.normalize_skill(skill) for skill in skills]
+            started = time.perf_counter()
+            results = main.mentor_index.recommend(keys, LIMIT)
+            index_times.append(time.perf_counter() - started)
+            if [(record.id, overlap) for record, overlap in results] != brute_force(users, taken, keys):
+                problems.append(f"skills={skills}: ranking differs from a full scan")
+
+            started = time.perf_counter()
+            body = await call(f"/api/mentors/recommend?skills={','.join(skills)}&limit={LIMIT}", token)
+            http_times.append(time.perf_counter() - started)
+            if [item["id"] for item in body] != [record.id for record, _ in results]:
+                problems.append(f"skills={skills}: endpoint differs from the index")
+        print(f"{size:>6} {statistics.median(index_times) * 1e6:>13.1f} {percentile(index_times, 0.99) * 1e6:>13.1f} "
+              f"{statistics.median(http_times) * 1000:>12.3f} {percentile(http_times, 0.99) * 1000:>12.3f}")
+    await main.async_engine.dispose()
+    return problems
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mentors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200, help="queries per skill count")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    problems = asyncio.run(run(args.mentors, args.queries, args.seed))
+    for problem in problems[:20]:
+        print(f"FAIL {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
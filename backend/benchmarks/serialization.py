@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+응답 직렬화 벤치마크
+
+멘토 1천/1만 명을 넣은 임시 DB에서 GET /api/mentors 와 매칭 요청 목록을
+기본 모드(Pydantic 모델 생성 + 검증)와 FAST_JSON 모드(행 -> dict -> orjson)로
+번갈아 호출해 요청당 시간을 비교합니다. 두 모드의 응답 본문과 헤더, OpenAPI 스키마가
+같은지도 함께 확인하고 다르면 실패합니다.
+
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --mentors 1000 10000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="serialization-")
+DB_PATH = os.path.join(_scratch, "serialization.db")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import delete, insert
+
+import main
+
+SKILLS = ["React", "Python", "Go", "Vue", "Rust", "Java", "Kotlin", "Swift"]
+REQUESTS_PER_MENTOR = 100  # rows in the mentor's incoming list
+
+
+def seed(mentors: int):
+    main.prepare_database()
+    with main.engine.begin() as conn:
+        for model in (main.MatchRequest, main.MentorSkill, main.User):
+            conn.execute(delete(model))
+        conn.execute(insert(main.User), [
+            {"id": i, "email": f"mentor{i}@example.com", "hashed_password": "x", "name": f"멘토 {i}",
+             "role": "mentor", "bio": "10년차 개발자입니다. " * 4, "skills": json.dumps(SKILLS[i % 8:i % 8 + 3])}
+            for i in range(1, mentors + 1)
+        ] + [
+            {"id": mentors + i, "email": f"mentee{i}@example.com", "hashed_password": "x", "name": f"Mentee {i}",
+             "role": "mentee", "bio": "", "skills": None}
+            for i in range(1, REQUESTS_PER_MENTOR + 1)
+        ])
+        conn.execute(insert(main.MatchRequest), [
+            {"mentor_id": 1, "mentee_id": mentors + i, "message": "안녕하세요, 멘토링 부탁드립니다.",
+             "status": "rejected"}
+            for i in range(1, REQUESTS_PER_MENTOR + 1)
+        ])
+    main.mentor_directory_cache.invalidate()
+
+
+async def call(path: str, token: str):
+    """Minimal in-process ASGI GET, so routing, dependencies and serialization all run"""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("testserver", 80), "root_path": "",
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await main.app(scope, receive, send)
+    if response["status"] != 200:
+        raise RuntimeError(f"GET {path} -> {response['status']}: {response['body'][:200]!r}")
+    return response
+
+
+def token_for(user_id: int, role: str) -> str:
+    return main.create_access_token(data={"user_id": user_id, "name": f"user {user_id}",
+                                          "email": f"{user_id}@example.com", "role": role})
+
+
+async def measure(path: str, token: str, fast: bool, repeat: int):
+    main.FAST_JSON = fast
+    timings = []
+    for _ in range(repeat):
+        # Measure building the response, not the directory cache
+        main.mentor_directory_cache._entries.clear()
+        started = time.perf_counter()
+        response = await call(path, token)
+        timings.append(time.perf_counter() - started)
+    return timings, response
+
+
+def compare(label: str, slow: dict, fast: dict) -> list:
+    problems = []
+    if json.loads(slow["body"]) != json.loads(fast["body"]):
+        problems.append(f"{label}: response bodies differ")
+    for header in ("x-next-cursor", "link", "etag"):
+        if slow["headers"].get(header) != fast["headers"].get(header):
+            problems.append(f"{label}: {header} header differs")
+    return problems
+
+
+async def run(sizes, repeat: int):
+    mentor = token_for(1, "mentor")
+    problems = []
+    print(f"orjson={'yes' if main.ORJSON_AVAILABLE else 'no (json fallback)'} repeat={repeat}")
+    print(f"{'mentors':>8}  {'endpoint':<40} {'default ms':>10} {'fast ms':>9} {'speedup':>8} {'bytes':>10}")
+    for mentors in sizes:
+        seed(mentors)
+        mentee = token_for(mentors + 1, "mentee")
+        for path, token in (("/api/mentors", mentee), ("/api/mentors?limit=100", mentee),
+                            ("/api/match-requests/incoming", mentor)):
+            # Warm up both modes once so the first measured call doesn't pay for imports or plans
+            await measure(path, token, False, 1)
+            await measure(path, token, True, 1)
+            slow, slow_response = await measure(path, token, False, repeat)
+            fast, fast_response = await measure(path, token, True, repeat)
+            problems += compare(f"{mentors} {path}", slow_response, fast_response)
+            slow_ms, fast_ms = statistics.median(slow) * 1000, statistics.median(fast) * 1000
+            print(f"{mentors:>8}  {path:<40} {slow_ms:>10.2f} {fast_ms:>9.2f} {slow_ms / fast_ms:>7.2f}x "
+                  f"{len(fast_response['body']):>10}")
+    await main.async_engine.dispose()
+    return problems
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mentors", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=10, help="timed requests per mode, median reported")
+    args = parser.parse_args()
+
+    # The schema comes from the route declarations, so it must not depend on the mode
+    main.FAST_JSON = False
+    schema = json.dumps(main.app.openapi(), sort_keys=True)
+    main.app.openapi_schema = None
+    main.FAST_JSON = True
+    problems = [] if json.dumps(main.app.openapi(), sort_keys=True) == schema else ["OpenAPI schema differs"]
+
+    problems += asyncio.run(run(args.mentors, args.repeat))
+    for problem in problems:
+        print(f"FAIL {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
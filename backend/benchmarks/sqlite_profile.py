@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+SQLite 프로덕션 프로필 벤치마크
+
+기본 SQLite 설정과 프로덕션 프로필(WAL + PRAGMA + 단일 writer 큐)에서
+동시 읽기/쓰기 처리량을 비교합니다.
+
+    python benchmarks/sqlite_profile.py --mentors 2000 --readers 16 --writers 8 --seconds 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep main.py from touching the real database on import
+_scratch = tempfile.mkdtemp(prefix="sqlite-bench-")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", f"sqlite:///{_scratch}/import.db")
+
+from sqlalchemy import create_engine, select, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+import main
+from main import Base, User, MatchRequest
+
+
+def build_database(path: str, profile: bool, mentors: int):
+    url = f"sqlite:///{path}"
+    pragmas = main.SQLITE_PRAGMAS if profile else {}
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    main.configure_sqlite_engine(sync_engine, pragmas)
+    Base.metadata.create_all(bind=sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "email": f"mentor{i}@example.com",
+                "hashed_password": "x",
+                "name": f"Mentor {i}",
+                "role": "mentor",
+                "bio": "Benchmark mentor " * 10,
+                "skills": '["React", "Python"]',
+            }
+            for i in range(mentors)
+        ])
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(
+        main.to_async_database_url(url),
+        connect_args={"check_same_thread": False},
+        pool_size=main.DB_POOL_SIZE,
+        max_overflow=main.DB_MAX_OVERFLOW,
+    )
+    main.configure_sqlite_engine(async_engine.sync_engine, pragmas)
+    return async_engine
+
+
+async def run_mixed(async_engine, profile: bool, mentors: int, readers: int, writers: int, seconds: float):
+    sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    deadline = time.perf_counter() + seconds
+    counts = {"reads": 0, "writes": 0, "write_errors": 0}
+
+    @asynccontextmanager
+    async def plain_transaction(db):
+        try:
+            yield db
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+
+    transaction = main.write_transaction if profile else plain_transaction
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            async with sessions() as db:
+                await db.scalar(select(User).where(User.id == random.randint(1, mentors)))
+                await db.scalars(select(User.id, User.name).where(User.role == "mentor").limit(50))
+            counts["reads"] += 1
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            async with sessions() as db:
+                try:
+                    async with transaction(db):
+                        await db.scalar(select(MatchRequest.id).where(MatchRequest.status == "accepted").limit(1))
+                        db.add(MatchRequest(
+                            mentor_id=random.randint(1, mentors),
+                            mentee_id=random.randint(1, mentors),
+                            message="benchmark",
+                            # Random pairs would break the one-pending-request-per-mentee index
+                            status="rejected",
+                        ))
+                    counts["writes"] += 1
+                except OperationalError:
+                    counts["write_errors"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[reader() for _ in range(readers)], *[writer() for _ in range(writers)])
+    elapsed = time.perf_counter() - started
+    await async_engine.dispose()
+    return {
+        "reads_per_sec": round(counts["reads"] / elapsed, 1),
+        "writes_per_sec": round(counts["writes"] / elapsed, 1),
+        "write_errors": counts["write_errors"],
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mentors", type=int, default=2000)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"mentors={args.mentors} readers={args.readers} writers={args.writers} seconds={args.seconds}")
+    for label, profile in (("default", False), ("production", True)):
+        path = os.path.join(_scratch, f"{label}.db")
+        async_engine = build_database(path, profile, args.mentors)
+        result = asyncio.run(run_mixed(async_engine, profile, args.mentors, args.readers, args.writers, args.seconds))
+        print(f"{label:>10}: {result['reads_per_sec']:>9} reads/s  {result['writes_per_sec']:>8} writes/s  "
+              f"{result['write_errors']} write errors")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+서버 시작 시간과 워커 메모리 측정
+
+임시 DB를 import_data.py 로 채운 뒤 세 가지 방식으로 서버를 띄워, 실행부터 모든 워커가 요청을 받을
+준비가 될 때까지의 시간(콜드 스타트)과 잠시 요청을 처리한 뒤 워커별 RSS/PSS 를 비교합니다.
+PSS 는 여러 프로세스가 공유하는 메모리를 나눠 센 값이라 워커 전체의 실제 메모리 사용량에 가깝습니다.
+/proc 을 읽으므로 Linux 에서만 동작합니다.
+
+- main.py: python main.py (프로세스 1개)
+- uvicorn: uvicorn main:app --workers N (워커마다 앱을 새로 import 하고 DB 준비)
+- serve: serve.py --workers N (DB 준비와 import 를 한 번 하고 fork)
+
+    python benchmarks/startup.py --workers 4
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+READY_LINE = "Application startup complete."
+MODES = ("main.py", "uvicorn", "serve")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_kib(pid: int) -> dict:
+    """Rss and Pss of a process in KiB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def worker_pids(master: int) -> list:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        if parent == master and b"resource_tracker" not in cmdline:
+            pids.append(int(entry))
+    return pids
+
+
+def measure_import(env: dict) -> str:
+    code = ("import sys, time; started = time.perf_counter(); import main; "
+            "print(f'{time.perf_counter() - started:.2f}s, PIL loaded: {\"PIL.Image\" in sys.modules}')")
+    return subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def warm_up(port: int, token: str, seconds: float):
+    """Keep every worker busy for a while so the measured memory includes request handling"""
+    deadline = time.perf_counter() + seconds
+
+    def client(n):
+        path = "/openapi.json" if n % 4 == 0 else "/api/mentors?limit=20"
+        while time.perf_counter() < deadline:
+            request = urllib.request.Request(f"http://127.0.0.1:{port}{path}",
+                                             headers={"Authorization": f"Bearer {token}"})
+            with urllib.request.urlopen(request) as response:
+                response.read()
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(client, range(8)))
+
+
+def run_mode(mode: str, workers: int, env: dict, token: str, warm_seconds: float) -> dict:
+    port = free_port()
+    env = dict(env, PORT=str(port))
+    if mode == "main.py":
+        command, workers = [sys.executable, "main.py"], 1
+    elif mode == "uvicorn":
+        command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers)]
+    else:
+        command = [sys.executable, "serve.py", "--port", str(port), "--workers", str(workers)]
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, text=True,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    all_ready = threading.Event()
+    ready_at = []
+
+    def follow_output():
+        for line in process.stdout:
+            if READY_LINE in line:
+                ready_at.append(time.perf_counter() - started)
+                if len(ready_at) == workers:
+                    all_ready.set()
+
+    threading.Thread(target=follow_output, daemon=True).start()
+    try:
+        if not all_ready.wait(120):
+            raise RuntimeError(f"{mode}: {len(ready_at)}/{workers} workers started within 120s")
+        # A single uvicorn process binds its port only after the app has started
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                break
+            except ConnectionRefusedError:
+                time.sleep(0.01)
+        ready_at[-1] = max(ready_at[-1], time.perf_counter() - started)
+        warm_up(port, token, warm_seconds)
+        time.sleep(0.5)
+        pids = [process.pid] if mode == "main.py" else worker_pids(process.pid)
+        per_worker = [memory_kib(pid) for pid in pids]
+        total_pss = sum(entry["Pss"] for entry in per_worker)
+        if mode != "main.py":
+            total_pss += memory_kib(process.pid)["Pss"]
+    finally:
+        process.terminate()
+        process.wait(30)
+    return {
+        "workers": len(pids),
+        "first_ready_s": ready_at[0],
+        "all_ready_s": ready_at[-1],
+        "rss_mib": sum(entry["Rss"] for entry in per_worker) / len(per_worker) / 1024,
+        "pss_mib": sum(entry["Pss"] for entry in per_worker) / len(per_worker) / 1024,
+        "total_pss_mib": total_pss / 1024,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mentors", type=int, default=2000)
+    parser.add_argument("--warm-seconds", type=float, default=3.0, help="request load before measuring memory")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="startup-")
+    env = dict(os.environ,
+               SQLALCHEMY_DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'startup.db')}",
+               METRICS_DIR=os.path.join(scratch, "metrics"))
+    subprocess.run([sys.executable, "import_data.py", "--generate-mentors", str(args.mentors),
+                    "--generate-mentees", "100"], cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    print(f"import main: {measure_import(env)}")
+
+    os.environ.update(env)
+    import main
+    token = main.create_access_token(data={"user_id": args.mentors + 1, "name": "Mentee",
+                                           "email": "mentee@example.com", "role": "mentee"})
+
+    print(f"{'mode':<8} {'workers':>7} {'first ready s':>14} {'all ready s':>12} "
+          f"{'RSS/worker MiB':>15} {'PSS/worker MiB':>15} {'total PSS MiB':>14}")
+    for mode in args.modes:
+        result = run_mode(mode, args.workers, env, token, args.warm_seconds)
+        print(f"{mode:<8} {result['workers']:>7} {result['first_ready_s']:>14.2f} {result['all_ready_s']:>12.2f} "
+              f"{result['rss_mib']:>15.1f} {result['pss_mib']:>15.1f} {result['total_pss_mib']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
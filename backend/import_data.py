@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+대량 데이터 가져오기 도구
+
+JSONL 또는 CSV 파일의 사용자(스킬, 프로필 이미지 포함)와 매칭 요청을 배치 트랜잭션으로
+한 번에 넣습니다. 부하 테스트용 합성 데이터도 만들 수 있습니다.
+
+    python import_data.py --users users.jsonl --match-requests requests.csv
+    python import_data.py --generate-mentors 100000 --generate-mentees 5000 --generate-requests 20000
+
+사용자 레코드: email, name, role(mentor|mentee), bio, skills(리스트 또는 "React,Python"),
+password 또는 hashed_password, image(파일 경로, data URL 또는 base64)
+매칭 요청 레코드: mentorEmail/menteeEmail 또는 mentorId/menteeId, message,
+status(기본 pending), createdAt, updatedAt
+
+password 는 --hash-workers 개 프로세스에서 bcrypt 로 해시합니다. 합성 데이터처럼 모두 같은
+비밀번호를 써도 되면 --shared-password 로 한 번만 해시해 재사용하세요.
+이미 있는 이메일과 멘토당 수락 1건/멘티당 대기 1건 규칙을 어기는 요청은 건너뜁니다.
+"""
+
+import argparse
+import binascii
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, insert, update, func, or_
+
+from main import (
+    engine, prepare_database, User, MentorSkill, DirectoryState, ProfileImage, MatchRequest, MATCH_REQUEST_STATUSES,
+    mentor_skill_rows, sanitize_input, get_password_hash, decode_image_data, detect_image_content_type
+)
+
+MAX_IMAGE_BYTES = 1024 * 1024  # same limit as PUT /api/profile
+
+
+def read_records(path: str):
+    """Yield one dict per JSONL line or CSV row"""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.DictReader(f)
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def batched(records, size: int):
+    iterator = iter(records)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def parse_skills(value) -> list:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = json.loads(value) if value.startswith("[") else value.split(",")
+    return [skill for skill in value if isinstance(skill, str) and skill.strip()]
+
+
+def parse_time(value):
+    """ISO 8601 to the naive UTC datetimes stored in the database"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def parse_id(value):
+    """User id from a CSV or JSON field, or None if it's empty"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or not str(value).strip().isdigit():
+        raise ValueError(f"ids must be positive integers, got {value!r}")
+    return int(value)
+
+
+def load_image(value, base_dir: str) -> bytes:
+    """Image bytes from raw bytes, a data URL, base64, or a path relative to the input file"""
+    if isinstance(value, bytes):
+        return value
+    path = os.path.join(base_dir, value)
+    if not value.startswith("data:") and os.path.isfile(path):
+        with open(path, "rb") as f:
+            return f.read()
+    return decode_image_data(value)
+
+
+class PasswordHashes:
+    """bcrypt hashes for a batch, computed across a process pool unless one shared hash is used"""
+
+    def __init__(self, workers: int, shared_password: str = None):
+        self.shared_hash = get_password_hash(shared_password) if shared_password else None
+        self.workers = max(1, workers)
+        self._pool = None
+
+    def hash_all(self, passwords: list) -> list:
+        if self.shared_hash:
+            return [self.shared_hash] * len(passwords)
+        if not passwords:
+            return []
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._pool.map(get_password_hash, passwords, chunksize=chunksize))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+def prepare_user(record: dict, base_dir: str, password_required: bool = True):
+    """Validate and sanitize one user record the way signup and PUT /api/profile would"""
+    email = (record.get("email") or "").strip()
+    role = record.get("role")
+    name = (record.get("name") or "").strip()
+    bio = record.get("bio") or ""
+    if "@" not in email or role not in ("mentor", "mentee") or not name or len(name) > 100 or len(bio) > 1000:
+        raise ValueError("needs an email, a role of mentor or mentee, a name up to 100 and a bio up to 1000 characters")
+    if password_required and not (record.get("hashed_password") or record.get("password")):
+        raise ValueError("needs a password or hashed_password")
+    skills = [sanitize_input(skill) for skill in parse_skills(record.get("skills")) if len(skill) <= 50]
+    image = None
+    if record.get("image"):
+        image = load_image(record["image"], base_dir)
+        if len(image) > MAX_IMAGE_BYTES or detect_image_content_type(image) not in ("image/png", "image/jpeg"):
+            raise ValueError("image must be a JPEG or PNG under 1MB")
+    return {
+        "email": email,
+        "hashed_password": record.get("hashed_password"),
+        "password": record.get("password"),
+        "name": sanitize_input(name),
+        "role": role,
+        "bio": sanitize_input(bio) if bio else "",
+        "skills": json.dumps(skills) if role == "mentor" else None,
+        "skill_list": skills,
+        "image": image,
+    }
+
+
+def import_users(records, hashes: PasswordHashes, batch_size: int, base_dir: str = ".") -> Counter:
+    summary = Counter()
+    for number, batch in enumerate(batched(records, batch_size)):
+        users = {}
+        for offset, record in enumerate(batch):
+            try:
+                user = prepare_user(record, base_dir, password_required=hashes.shared_hash is None)
+            except (ValueError, binascii.Error, OSError) as e:
+                summary["invalid"] += 1
+                print(f"user record {number * batch_size + offset + 1}: {e}", file=sys.stderr)
+                continue
+            if user["email"] in users:
+                summary["duplicate"] += 1
+                continue
+            users[user["email"]] = user
+
+        # Hash outside the write transaction so other writers aren't held up by bcrypt
+        pending = [user for user in users.values() if not user["hashed_password"]]
+        for user, hashed in zip(pending, hashes.hash_all([user["password"] for user in pending])):
+            user["hashed_password"] = hashed
+        images = {}
+        for user in users.values():
+            if user["image"] is not None:
+                user["profile_image_hash"] = hashlib.sha256(user["image"]).hexdigest()
+                images[user["profile_image_hash"]] = user["image"]
+
+        with engine.execution_options(sqlite_begin="IMMEDIATE").begin() as conn:
+            for email in conn.scalars(select(User.email).where(User.email.in_(list(users)))):
+                summary["existing"] += 1
+                del users[email]
+            if not users:
+                continue
+
+            next_id = (conn.scalar(select(func.max(User.id))) or 0) + 1
+            now = datetime.utcnow()
+            user_rows, skill_rows = [], []
+            for user_id, user in enumerate(users.values(), next_id):
+                user_rows.append({
+                    "id": user_id, "email": user["email"], "hashed_password": user["hashed_password"],
+                    "name": user["name"], "role": user["role"], "bio": user["bio"], "skills": user["skills"],
+                    "profile_image_hash": user.get("profile_image_hash"), "created_at": now,
+                })
+                if user["role"] == "mentor":
+                    skill_rows += mentor_skill_rows(user_id, user["skill_list"])
+            conn.execute(insert(User), user_rows)
+            if skill_rows:
+                conn.execute(insert(MentorSkill), skill_rows)
+
+            if images:
+                stored = set(conn.scalars(select(ProfileImage.hash).where(ProfileImage.hash.in_(list(images)))))
+                new_images = [
+                    {"hash": digest, "content_type": detect_image_content_type(data), "size": len(data),
+                     "data": data, "created_at": now}
+                    for digest, data in images.items() if digest not in stored
+                ]
+                if new_images:
+                    conn.execute(insert(ProfileImage), new_images)
+                summary["images"] += len(new_images)
+
+            mentors = sum(1 for row in user_rows if row["role"] == "mentor")
+            if mentors:
+                conn.execute(
+                    update(DirectoryState)
+                    .where(DirectoryState.name == "mentors")
+                    .values(version=DirectoryState.version + 1, updated_at=now)
+                )
+            summary["mentors"] += mentors
+            summary["mentees"] += len(user_rows) - mentors
+    return summary
+
+
+def import_match_requests(records, batch_size: int) -> Counter:
+    summary = Counter()
+    for number, batch in enumerate(batched(records, batch_size)):
+        parsed = []
+        for offset, record in enumerate(batch):
+            try:
+                parsed.append((record, parse_id(record.get("mentorId")), parse_id(record.get("menteeId")),
+                               parse_time(record.get("createdAt")), parse_time(record.get("updatedAt"))))
+            except ValueError as e:
+                summary["invalid"] += 1
+                print(f"match request record {number * batch_size + offset + 1}: {e}", file=sys.stderr)
+        emails = {
+            email.strip()
+            for record, *_ in parsed for email in (record.get("mentorEmail"), record.get("menteeEmail")) if email
+        }
+        ids = {user_id for _, mentor_id, mentee_id, _, _ in parsed for user_id in (mentor_id, mentee_id) if user_id}
+        now = datetime.utcnow()
+
+        with engine.execution_options(sqlite_begin="IMMEDIATE").begin() as conn:
+            users = conn.execute(
+                select(User.id, User.email, User.role).where(or_(User.email.in_(list(emails)), User.id.in_(list(ids))))
+            ).all()
+            by_email = {user.email: user for user in users}
+            by_id = {user.id: user for user in users}
+
+            rows = []
+            for record, mentor_id, mentee_id, created_at, updated_at in parsed:
+                mentor = by_email.get((record.get("mentorEmail") or "").strip()) or by_id.get(mentor_id)
+                mentee = by_email.get((record.get("menteeEmail") or "").strip()) or by_id.get(mentee_id)
+                status = record.get("status") or "pending"
+                message = (record.get("message") or "").strip()
+                if not mentor or mentor.role != "mentor" or not mentee or mentee.role != "mentee" \
+                        or status not in MATCH_REQUEST_STATUSES or not message or len(message) > 500:
+                    summary["invalid"] += 1
+                    continue
+                created_at = created_at or now
+                rows.append({
+                    "mentor_id": mentor.id, "mentee_id": mentee.id, "message": sanitize_input(message),
+                    "status": status, "created_at": created_at, "updated_at": updated_at or created_at,
+                })
+            if not rows:
+                continue
+            # The partial unique indexes drop requests that would give a mentor a second
+            # accepted mentee or a mentee a second pending request
+            result = conn.execute(insert(MatchRequest).prefix_with("OR IGNORE", dialect="sqlite"), rows)
+            summary["imported"] += result.rowcount
+            summary["conflicting"] += len(rows) - result.rowcount
+            if result.rowcount and any(row["status"] == "accepted" for row in rows):
+                # Running servers rebuild their recommendation index
+                conn.execute(
+                    update(DirectoryState)
+                    .where(DirectoryState.name == "mentor_availability")
+                    .values(version=DirectoryState.version + 1, updated_at=now)
+                )
+    return summary
+
+
+def generate_images(count: int) -> list:
+    """Distinct square PNGs that pass the upload checks"""
+    from PIL import Image
+    images = []
+    for n in range(count):
+        out = io.BytesIO()
+        Image.new("RGB", (500, 500), ((n * 67) % 256, (n * 131) % 256, (n * 199) % 256)).save(out, "PNG")
+        images.append(out.getvalue())
+    return images
+
+
+def generate_users(mentors: int, mentees: int, images: list, domain: str, seed: int):
+    rng = random.Random(seed)
+    skills = ["React", "Vue", "Angular", "Python", "Django", "FastAPI", "Go", "Rust", "Java", "Spring",
+              "Kotlin", "Swift", "TypeScript", "Node.js", "AWS", "Kubernetes", "PostgreSQL", "ML"]
+    for i in range(mentors):
+        yield {
+            "email": f"mentor{i}@{domain}", "name": f"Mentor {i}", "role": "mentor",
+            "bio": f"{rng.randint(1, 20)}년차 개발자입니다.", "skills": rng.sample(skills, rng.randint(1, 4)),
+            "image": images[i % len(images)] if images else None,
+        }
+    for i in range(mentees):
+        yield {"email": f"mentee{i}@{domain}", "name": f"Mentee {i}", "role": "mentee", "bio": ""}
+
+
+def generate_match_requests(count: int, mentors: int, mentees: int, domain: str, seed: int):
+    """Each mentee's first request is pending; later ones are rejected or cancelled, spread over 90 days"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    for k in range(count):
+        updated_at = now - timedelta(seconds=rng.randint(0, 90 * 86400)) if k >= mentees else now
+        yield {
+            "mentorEmail": f"mentor{rng.randrange(mentors)}@{domain}",
+            "menteeEmail": f"mentee{k % mentees}@{domain}",
+            "message": "멘토링 부탁드립니다.",
+            "status": "pending" if k < mentees else rng.choice(["rejected", "cancelled"]),
+            "createdAt": updated_at.isoformat(),
+            "updatedAt": updated_at.isoformat(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", action="append", default=[], help="users .jsonl or .csv (repeatable)")
+    parser.add_argument("--match-requests", action="append", default=[], help="match requests .jsonl or .csv (repeatable)")
+    parser.add_argument("--generate-mentors", type=int, default=0)
+    parser.add_argument("--generate-mentees", type=int, default=0)
+    parser.add_argument("--generate-requests", type=int, default=0)
+    parser.add_argument("--generate-images", type=int, default=10, help="distinct images shared by generated mentors")
+    parser.add_argument("--email-domain", default="example.com", help="domain of generated emails")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per transaction (default: 5000)")
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1, help="bcrypt processes")
+    parser.add_argument("--shared-password", help="hash this once and use it for every user without hashed_password")
+    parser.add_argument("--variants", action="store_true", help="render thumbnail/WebP variants for new images afterwards")
+    args = parser.parse_args()
+
+    generating = args.generate_mentors or args.generate_mentees or args.generate_requests
+    if generating and not args.shared_password:
+        args.shared_password = "password123"
+    if args.generate_requests and not (args.generate_mentors and args.generate_mentees):
+        parser.error("--generate-requests needs --generate-mentors and --generate-mentees")
+
+    prepare_database()
+    hashes = PasswordHashes(args.hash_workers, args.shared_password)
+    started_at = time.perf_counter()
+    try:
+        users = Counter()
+        for path in args.users:
+            users += import_users(read_records(path), hashes, args.batch_size, os.path.dirname(os.path.abspath(path)))
+        if args.generate_mentors or args.generate_mentees:
+            images = generate_images(args.generate_images) if args.generate_mentors and args.generate_images else []
+            users += import_users(
+                generate_users(args.generate_mentors, args.generate_mentees, images, args.email_domain, args.seed),
+                hashes, args.batch_size
+            )
+        requests = Counter()
+        for path in args.match_requests:
+            requests += import_match_requests(read_records(path), args.batch_size)
+        if args.generate_requests:
+            requests += import_match_requests(generate_match_requests(
+                args.generate_requests, args.generate_mentors, args.generate_mentees, args.email_domain, args.seed
+            ), args.batch_size)
+    finally:
+        hashes.shutdown()
+
+    elapsed = time.perf_counter() - started_at
+    print(f"users: mentors={users['mentors']} mentees={users['mentees']} images={users['images']} "
+          f"existing={users['existing']} duplicate={users['duplicate']} invalid={users['invalid']}")
+    print(f"match requests: imported={requests['imported']} conflicting={requests['conflicting']} "
+          f"invalid={requests['invalid']}")
+    print(f"done in {elapsed:.1f}s")
+
+    if args.variants and users["images"]:
+        from migrate_images import backfill_image_variants
+        print(f"variants rendered for {backfill_image_variants()} images")
+
+
+if __name__ == "__main__":
+    main()
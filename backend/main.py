@@ -1,51 +1,458 @@
 import os
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, APIRouter, Request
+from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, APIRouter, Request, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import Response, RedirectResponse
+from fastapi.responses import Response, RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import sessionmaker, Session, relationship, declarative_base
+from starlette.routing import Match
+from sqlalchemy import create_engine, event, inspect, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, LargeBinary, Index, select, insert, update, delete, func, and_, or_, table, column, literal_column, literal, tuple_, case, exists
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker, relationship, declarative_base, deferred, aliased
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 import jwt
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError
 from passlib.context import CryptContext
 import base64
 import binascii
 import html
+import importlib.util
 import re
 import json
+# Pillow is imported by the image functions on first use, so starting a worker doesn't load it
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+if not PIL_AVAILABLE:
+    print("Warning: Pillow not available. Image processing will be limited.")
 try:
-    from PIL import Image
-    PIL_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    PIL_AVAILABLE = False
-    print("Warning: Pillow not available. Image processing will be limited.")
+    ORJSON_AVAILABLE = False
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
 import io
 import uuid
+import hashlib
+import asyncio
+import threading
+import time
+import math
+import contextvars
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import asynccontextmanager
 
 # Database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///./mentor_mentee.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite:///./mentor_mentee.db")
+
+def to_async_database_url(url: str) -> str:
+    """Map a sync database URL onto its asyncio driver (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        dialect, driver = scheme.split("+", 1)
+        if driver in ("aiosqlite", "asyncpg", "aiomysql", "asyncmy"):
+            return url
+    else:
+        dialect = scheme
+    async_drivers = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+    if dialect not in async_drivers:
+        raise ValueError(f"No async driver known for database URL scheme '{scheme}'")
+    return f"{dialect}+{async_drivers[dialect]}{sep}{rest}"
+
+ASYNC_DATABASE_URL = to_async_database_url(SQLALCHEMY_DATABASE_URL)
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+
+# Async connection pool used by the request handlers.
+#   DB_POOL_SIZE     connections kept open (default 10). With aiosqlite every connection
+#                    owns a thread, so this bounds concurrent DB work, not in-flight requests.
+#   DB_MAX_OVERFLOW  extra connections opened under bursts (default 20).
+#   DB_POOL_TIMEOUT  seconds a request awaits a free connection before failing (default 30).
+# Requests beyond pool_size + max_overflow wait on the pool without blocking the event loop.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# SQLite production profile, applied to every new connection.
+# Set SQLITE_PRODUCTION_PROFILE=0 to fall back to SQLite's defaults.
+SQLITE_PRODUCTION_PROFILE = os.getenv("SQLITE_PRODUCTION_PROFILE", "1") == "1"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # readers never block the writer and vice versa
+    "synchronous": "NORMAL",      # fsync on checkpoint only; safe with WAL
+    "busy_timeout": 5000,         # wait up to 5s for another process's write lock
+    "mmap_size": 268435456,       # 256MB memory-mapped reads
+    "cache_size": -65536,         # 64MB page cache per connection
+    "temp_store": "MEMORY",
+}
+
+def configure_sqlite_engine(sync_engine, pragmas: Optional[dict] = None):
+    """Apply PRAGMAs at connect time and let sessions open BEGIN IMMEDIATE transactions"""
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # Let SQLAlchemy emit BEGIN itself so write transactions can take the lock up front
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in (pragmas or {}).items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(sync_engine, "begin")
+    def begin_sqlite_transaction(conn):
+        if conn.get_execution_options().get("sqlite_begin") == "IMMEDIATE":
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+# pre-ping and recycle only matter for networked databases, not a local file
+pool_options = {} if IS_SQLITE else {"pool_pre_ping": True, "pool_recycle": 300}
+
+# Sync engine for schema setup and command-line tooling
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False},
-    pool_pre_ping=True,
-    pool_recycle=300
+    connect_args=connect_args,
+    **pool_options
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine for the request handlers
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=connect_args,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    **pool_options
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if IS_SQLITE:
+    active_pragmas = SQLITE_PRAGMAS if SQLITE_PRODUCTION_PROFILE else {}
+    configure_sqlite_engine(engine, active_pragmas)
+    configure_sqlite_engine(async_engine.sync_engine, active_pragmas)
+
+# Prometheus metrics. With several workers, set METRICS_DIR to a directory they share:
+# each worker writes its totals there every METRICS_FLUSH_SECONDS and /metrics sums them.
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Metrics:
+    """Counters and histograms rendered in the Prometheus text format, summed across workers.
+
+    Only touched from the event loop, except where callers hold their own lock.
+    """
+
+    def __init__(self, directory: str, flush_seconds: float):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> per-bucket counts, +Inf count, sum
+        self.collectors = []  # callables returning ("counter" | "gauge", name, labels, value) at scrape time
+        self._task = None
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1.0):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        entry = self.histograms.get((name, labels))
+        if entry is None:
+            entry = self.histograms[(name, labels)] = [0] * (len(METRICS_BUCKETS) + 1) + [0.0]
+        entry[bisect_left(METRICS_BUCKETS, value)] += 1
+        entry[-1] += value
+
+    def snapshot(self) -> dict:
+        counters = [[name, labels, value] for (name, labels), value in self.counters.items()]
+        gauges = []
+        for collect in self.collectors:
+            for kind, name, labels, value in collect():
+                (counters if kind == "counter" else gauges).append([name, labels, value])
+        return {
+            "pid": os.getpid(),
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": [[name, labels, list(entry)] for (name, labels), entry in self.histograms.items()],
+        }
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"metrics-{pid}.json")
+
+    def write_snapshot(self):
+        path = self._path(os.getpid())
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f"{path}.tmp", path)
+
+    def _snapshots(self) -> list:
+        """This worker's live snapshot plus every other worker's last flush"""
+        own = self.snapshot()
+        if not self.directory:
+            return [own]
+        self.write_snapshot()
+        snapshots = [own]
+        for name in os.listdir(self.directory):
+            if not (name.startswith("metrics-") and name.endswith(".json")) or name == f"metrics-{own['pid']}.json":
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # Counters of exited workers still count; their gauges no longer describe anything
+            try:
+                os.kill(snapshot["pid"], 0)
+            except ProcessLookupError:
+                snapshot["gauges"] = []
+            except PermissionError:
+                pass
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self) -> str:
+        counters, gauges, histograms = {}, {}, {}
+        for snapshot in self._snapshots():
+            for target, rows in ((counters, snapshot["counters"]), (gauges, snapshot["gauges"])):
+                for name, labels, value in rows:
+                    key = (name, tuple(tuple(pair) for pair in labels))
+                    target[key] = target.get(key, 0.0) + value
+            for name, labels, entry in snapshot["histograms"]:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                merged = histograms.setdefault(key, [0] * len(entry))
+                for i, value in enumerate(entry):
+                    merged[i] += value
+        
+        lines = []
+        for kind, values in (("counter", counters), ("gauge", gauges)):
+            for name in sorted({name for name, _ in values}):
+                lines.append(f"# TYPE {name} {kind}")
+                lines += [f"{name}{format_labels(labels)} {value:g}"
+                          for (metric, labels), value in sorted(values.items()) if metric == name]
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), entry in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(METRICS_BUCKETS + ("+Inf",), entry[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {entry[-1]:g}")
+                lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                print(f"Warning: could not write metrics snapshot: {e}")
+
+    def start(self):
+        if self.directory and self._task is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._task = asyncio.create_task(self._flush_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.write_snapshot()
+
+def format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+metrics = Metrics(METRICS_DIR, METRICS_FLUSH_SECONDS)
+
+# Queries run by the current request, as [count, seconds]; None outside requests
+request_db_usage = contextvars.ContextVar("request_db_usage", default=None)
+BACKGROUND_DB_LABELS = (("method", ""), ("route", "background"))
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def record_query_time(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    usage = request_db_usage.get()
+    if usage is None:
+        metrics.inc("db_queries_total", BACKGROUND_DB_LABELS)
+        metrics.inc("db_query_seconds_total", BACKGROUND_DB_LABELS, elapsed)
+    else:
+        usage[0] += 1
+        usage[1] += elapsed
+
+class WriteQueue:
+    """Serialize write transactions in-process, first come first served.
+
+    SQLite allows a single writer; queueing here means concurrent writers wait
+    their turn instead of failing with "database is locked".
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+        self._transactions = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def acquire(self):
+        self._waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await self._lock.acquire()
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - queued_at
+        self._transactions += 1
+        self._wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def stats(self) -> dict:
+        count = self._transactions
+        return {
+            "queue_depth": self._waiting,
+            "transactions": count,
+            "avg_wait_ms": round(self._wait_seconds / count * 1000, 3) if count else 0.0,
+            "max_wait_ms": round(self._max_wait_seconds * 1000, 3),
+        }
+
+write_queue = WriteQueue()
+
+@asynccontextmanager
+async def write_transaction(db: AsyncSession):
+    """Run the enclosed reads and writes as one serialized write transaction.
+
+    Commits on success and rolls back on any exception.
+    """
+    async with write_queue.acquire():
+        # End the read transaction left open by get_current_user so the write
+        # transaction starts from a fresh snapshot
+        if db.in_transaction():
+            await db.commit()
+        await db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+        try:
+            yield db
+            await db.commit()
+        except BaseException:
+            db.info.pop("after_commit", None)
+            await db.rollback()
+            raise
+    for callback in db.info.pop("after_commit", []):
+        callback()
+
+def after_commit(db: AsyncSession, callback):
+    """Run callback once the enclosing write_transaction has committed"""
+    db.info.setdefault("after_commit", []).append(callback)
 Base = declarative_base()
 
+# Profile image caching
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+IMAGE_OWNER_TTL_SECONDS = float(os.getenv("IMAGE_OWNER_TTL_SECONDS", "30"))
+IMAGE_IMMUTABLE_MAX_AGE = 31536000  # one year, for the ?v=<hash> URLs profile_image_url() builds
+IMAGE_VERSION_MIN_LENGTH = 16  # hex chars of the hash a ?v= pin needs; shorter ones match too many images
+
+# Mentor directory response cache. Other workers' writes are picked up within
+# MENTOR_CACHE_VERSION_TTL seconds; this worker's own writes immediately.
+MENTOR_CACHE_MAX_ENTRIES = int(os.getenv("MENTOR_CACHE_MAX_ENTRIES", "256"))
+MENTOR_CACHE_VERSION_TTL = float(os.getenv("MENTOR_CACHE_VERSION_TTL", "1"))
+
+# /api/mentors/recommend answers from an in-process index of all mentors, checked
+# against directory_state on the same MENTOR_CACHE_VERSION_TTL schedule
+RECOMMEND_MAX_SKILLS = 20
+RECOMMEND_DEFAULT_LIMIT = 20
+RECOMMEND_MAX_LIMIT = 100
+
+# Match request event streams. "local" keeps events in this process; "database"
+# shares them between workers through the match_events table.
+MATCH_EVENT_BROKER = os.getenv("MATCH_EVENT_BROKER", "local")
+MATCH_EVENT_BUFFER = int(os.getenv("MATCH_EVENT_BUFFER", "1000"))  # local: events kept for Last-Event-ID resume
+MATCH_EVENT_RETENTION_SECONDS = float(os.getenv("MATCH_EVENT_RETENTION_SECONDS", "3600"))  # database
+MATCH_EVENT_POLL_SECONDS = float(os.getenv("MATCH_EVENT_POLL_SECONDS", "0.5"))  # database
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_QUEUE_SIZE = 100  # events buffered per stream before a stalled client is disconnected
+SSE_RETRY_MS = 3000
+
+# Rejected/cancelled requests older than ARCHIVE_AFTER_DAYS move to match_requests_archive,
+# checked every ARCHIVE_INTERVAL_SECONDS (0 disables), ARCHIVE_BATCH_SIZE rows per transaction
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_BATCH_PAUSE_SECONDS = 0.05  # lets other writers take the lock between batches
+
+# Pre-sized variants generated at upload time, encoded in IMAGE_WORKERS processes
+IMAGE_VARIANT_SIZES = (64, 128, 256)
+IMAGE_VARIANT_FORMATS = ("webp", "jpeg")
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# PUT /api/profile/image streams the multipart body and gives up as soon as the image
+# passes IMAGE_UPLOAD_MAX_BYTES or the whole body passes that plus the form overhead
+IMAGE_UPLOAD_MAX_BYTES = 1024 * 1024
+IMAGE_UPLOAD_OVERHEAD_BYTES = 16 * 1024
+
+# Verified tokens are trusted for TOKEN_CACHE_TTL seconds (never past their exp);
+# /me serves user rows up to USER_CACHE_TTL seconds old.
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "300"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "5"))
+
+# FAST_JSON=1 builds the mentor and match request lists straight from rows into bytes
+# (orjson when installed), skipping the per-item Pydantic models and FastAPI's second
+# validation pass. The routes keep their response_model, so OpenAPI is unchanged.
+FAST_JSON = os.getenv("FAST_JSON", "0") == "1"
+
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: bcrypt cost and size of the worker pool that runs it.
+# Hashes created with a different cost are rehashed on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# Admission control for /api requests, checked before routing.
+# Each route in ADMISSION_ROUTES runs at most ADMISSION_CONCURRENCY requests at once (0 disables);
+# up to ADMISSION_QUEUE more wait in line for at most ADMISSION_MAX_WAIT_SECONDS, and anything
+# beyond that gets 503 with Retry-After straight away.
+ADMISSION_ROUTES = ("POST /api/login", "POST /api/signup", "PUT /api/profile", "PUT /api/profile/image")
+ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", str(PASSWORD_HASH_WORKERS * 2)))
+ADMISSION_QUEUE = int(os.getenv("ADMISSION_QUEUE", str(PASSWORD_HASH_WORKERS * 8)))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "1"))
+# Opt-in token buckets: every client address, and every signed-in user, may average *_PER_SECOND
+# requests with bursts of up to *_BURST (0 per second, the default, disables). Excess gets 429
+# with Retry-After. Buckets live in each worker, so N workers admit up to N times the rate.
+RATE_LIMIT_IP_PER_SECOND = float(os.getenv("RATE_LIMIT_IP_PER_SECOND", "0"))
+RATE_LIMIT_IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", "100"))
+RATE_LIMIT_USER_PER_SECOND = float(os.getenv("RATE_LIMIT_USER_PER_SECOND", "0"))
+RATE_LIMIT_USER_BURST = int(os.getenv("RATE_LIMIT_USER_BURST", "40"))
+RATE_LIMIT_MAX_CLIENTS = 100000  # buckets kept per kind; the least recently seen are dropped
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 security = HTTPBearer(auto_error=False)
 
 # Database Models
@@ -58,9 +465,54 @@ class User(Base):
     name = Column(String)
     role = Column(String)  # "mentor" or "mentee"
     bio = Column(Text)
-    profile_image = Column(Text)  # Base64 encoded image
+    profile_image = deferred(Column(Text))  # Legacy base64 image, moved to profile_images by migrate_images.py
+    profile_image_hash = Column(String(64))  # SHA-256 key into profile_images
     skills = Column(Text)  # JSON string for mentor skills
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_users_role_name_id", "role", "name", "id"),  # orderBy=name keyset pages
+    )
+
+class MentorSkill(Base):
+    """One row per mentor skill, kept in sync with User.skills so filters are index lookups"""
+    __tablename__ = "mentor_skills"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    skill_normalized = Column(String, primary_key=True)  # stripped and lower-cased
+    position = Column(Integer, nullable=False)  # order in the mentor's skill list
+    
+    __table_args__ = (
+        Index("ix_mentor_skills_skill_user", "skill_normalized", "user_id"),
+        Index("ix_mentor_skills_position_skill", "position", "skill_normalized", "user_id"),
+    )
+
+class DirectoryState(Base):
+    """Monotonic versions of the mentor directory, bumped by every write that changes it"""
+    __tablename__ = "directory_state"
+    
+    name = Column(String, primary_key=True)  # "mentors", "mentor_availability"
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ProfileImage(Base):
+    """Content-addressed image blobs; identical uploads are stored once"""
+    __tablename__ = "profile_images"
+    
+    hash = Column(String(64), primary_key=True)  # SHA-256 hex digest of data
+    content_type = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ProfileImageVariant(Base):
+    """Resized copies of an uploaded image, themselves stored in profile_images"""
+    __tablename__ = "profile_image_variants"
+    
+    image_hash = Column(String(64), primary_key=True)  # original image
+    size = Column(Integer, primary_key=True)  # width and height in pixels
+    format = Column(String, primary_key=True)  # "webp" or "jpeg"
+    variant_hash = Column(String(64), nullable=False)  # resized image
 
 class MatchRequest(Base):
     __tablename__ = "match_requests"
@@ -71,12 +523,212 @@ class MatchRequest(Base):
     message = Column(Text)
     status = Column(String, default="pending")  # "pending", "accepted", "rejected", "cancelled"
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)  # last status change, for ?since= sync
     
     mentor = relationship("User", foreign_keys=[mentor_id])
     mentee = relationship("User", foreign_keys=[mentee_id])
+    
+    # A mentor has at most one accepted mentee; a mentee at most one pending request
+    __table_args__ = (
+        Index("ux_match_requests_mentor_accepted", "mentor_id", unique=True,
+              sqlite_where=status == "accepted", postgresql_where=status == "accepted"),
+        Index("ux_match_requests_mentee_pending", "mentee_id", unique=True,
+              sqlite_where=status == "pending", postgresql_where=status == "pending"),
+        # Incoming/outgoing lists and the create/accept preconditions
+        Index("ix_match_requests_mentor_status", "mentor_id", "status"),
+        Index("ix_match_requests_mentee_status", "mentee_id", "status"),
+        Index("ix_match_requests_mentee_mentor_status", "mentee_id", "mentor_id", "status"),
+        # ?since= incremental sync, ordered by (updated_at, id)
+        Index("ix_match_requests_mentor_updated", "mentor_id", "updated_at"),
+        Index("ix_match_requests_mentee_updated", "mentee_id", "updated_at"),
+        # The archiver's search for old terminal requests
+        Index("ix_match_requests_status_updated", "status", "updated_at"),
+    )
+
+class MatchRequestArchive(Base):
+    """Rejected and cancelled requests moved out of match_requests by the archiver"""
+    __tablename__ = "match_requests_archive"
+    
+    id = Column(Integer, primary_key=True)  # same id the request had in match_requests
+    mentor_id = Column(Integer, ForeignKey("users.id"))
+    mentee_id = Column(Integer, ForeignKey("users.id"))
+    message = Column(Text)
+    status = Column(String)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_match_requests_archive_mentor_updated", "mentor_id", "updated_at"),
+        Index("ix_match_requests_archive_mentee_updated", "mentee_id", "updated_at"),
+    )
+
+class MatchEvent(Base):
+    """Outbox of match request changes, read by every worker when MATCH_EVENT_BROKER=database"""
+    __tablename__ = "match_events"
+    
+    id = Column(Integer, primary_key=True)
+    mentor_id = Column(Integer, nullable=False)
+    mentee_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON, same shape as MatchRequestResponse
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # AUTOINCREMENT so ids are never reused after old events are pruned; they are the SSE event ids
+    __table_args__ = (
+        Index("ix_match_events_mentor_id", "mentor_id", "id"),
+        Index("ix_match_events_mentee_id", "mentee_id", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+def normalize_skill(skill: str) -> str:
+    return skill.strip().lower()
+
+def mentor_skill_rows(user_id: int, skills: List[str]) -> List[dict]:
+    """mentor_skills rows for a skill list, dropping duplicates after normalization"""
+    rows = []
+    seen = set()
+    for skill in skills:
+        normalized = normalize_skill(skill)
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            rows.append({"user_id": user_id, "skill_normalized": normalized, "position": len(rows)})
+    return rows
+
+def dump_json(data) -> bytes:
+    """Encode plain dicts and lists the way FastAPI encodes response models (datetimes as ISO 8601)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=datetime.isoformat).encode()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+def load_skills(value: Optional[str]) -> List[str]:
+    try:
+        skills = json.loads(value) if value else []
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return skills if isinstance(skills, list) else []
+
+# Full-text mentor search (SQLite FTS5). rowid is the user id; triggers on users keep it current.
+MENTOR_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS mentor_search USING fts5("
+    "name, bio, skills, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS mentor_search_insert AFTER INSERT ON users WHEN new.role = 'mentor' BEGIN "
+    "INSERT INTO mentor_search(rowid, name, bio, skills) VALUES (new.id, new.name, new.bio, new.skills); END",
+    "CREATE TRIGGER IF NOT EXISTS mentor_search_update AFTER UPDATE OF name, bio, skills, role ON users BEGIN "
+    "DELETE FROM mentor_search WHERE rowid = old.id; "
+    "INSERT INTO mentor_search(rowid, name, bio, skills) SELECT new.id, new.name, new.bio, new.skills "
+    "WHERE new.role = 'mentor'; END",
+    "CREATE TRIGGER IF NOT EXISTS mentor_search_delete AFTER DELETE ON users BEGIN "
+    "DELETE FROM mentor_search WHERE rowid = old.id; END",
+]
+# BM25 column weights: name, bio, skills
+MENTOR_SEARCH_WEIGHTS = (10.0, 1.0, 5.0)
+mentor_search = table("mentor_search", column("rowid"))
+MENTOR_SEARCH_FTS = False  # set by install_mentor_search when FTS5 is available
+
+def install_mentor_search(bind):
+    """Create the FTS5 index and triggers, filling it from existing mentors on first run"""
+    global MENTOR_SEARCH_FTS
+    if bind.dialect.name != "sqlite":
+        return
+    try:
+        with bind.begin() as conn:
+            created = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE name = 'mentor_search'"
+            ).first() is None
+            for statement in MENTOR_SEARCH_DDL:
+                conn.exec_driver_sql(statement)
+            if created:
+                conn.exec_driver_sql(
+                    "INSERT INTO mentor_search(rowid, name, bio, skills) "
+                    "SELECT id, name, bio, skills FROM users WHERE role = 'mentor'"
+                )
+        MENTOR_SEARCH_FTS = True
+    except OperationalError as e:
+        # SQLite built without FTS5; search falls back to LIKE
+        print(f"Warning: full-text search unavailable ({e})")
+
+def build_search_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    terms = re.findall(r"\w+", text.lower())
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms[:10])
+
+# Schema migrations. create_all only creates missing tables, so columns and backfills
+# for existing tables go here. Steps are idempotent; on SQLite the number applied is
+# kept in PRAGMA user_version so each runs once. Declared indexes are checked on every
+# start, so a new Index() in a model needs no migration step.
+def add_profile_image_hash(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("users")}
+    if "profile_image_hash" not in columns:
+        conn.exec_driver_sql("ALTER TABLE users ADD COLUMN profile_image_hash VARCHAR(64)")
+
+def create_missing_indexes(conn):
+    for model_table in Base.metadata.sorted_tables:
+        for index in model_table.indexes:
+            try:
+                with conn.begin_nested():
+                    index.create(conn, checkfirst=True)
+            except IntegrityError:
+                print(f"Warning: existing rows violate unique index {index.name}; it was not created")
+
+def add_match_request_updated_at(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("match_requests")}
+    if "updated_at" not in columns:
+        conn.exec_driver_sql("ALTER TABLE match_requests ADD COLUMN updated_at DATETIME")
+    conn.exec_driver_sql(
+        "UPDATE match_requests SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL"
+    )
+
+def seed_directory_state(conn):
+    if conn.scalar(select(DirectoryState.version).where(DirectoryState.name == "mentors")) is None:
+        conn.execute(insert(DirectoryState).values(name="mentors", version=0, updated_at=datetime.utcnow()))
+
+def seed_mentor_availability_state(conn):
+    if conn.scalar(select(DirectoryState.version).where(DirectoryState.name == "mentor_availability")) is None:
+        conn.execute(insert(DirectoryState).values(name="mentor_availability", version=0, updated_at=datetime.utcnow()))
+
+def backfill_mentor_skills(conn):
+    if conn.scalar(select(MentorSkill.user_id).limit(1)) is None:
+        mentors = conn.execute(
+            select(User.id, User.skills).where(User.role == "mentor", User.skills.is_not(None))
+        )
+        rows = [row for user_id, skills in mentors for row in mentor_skill_rows(user_id, load_skills(skills))]
+        if rows:
+            conn.execute(insert(MentorSkill), rows)
+
+# Append only: a database at user_version N has applied the first N steps
+MIGRATIONS = [
+    add_profile_image_hash,
+    seed_directory_state,
+    backfill_mentor_skills,
+    add_match_request_updated_at,
+    seed_mentor_availability_state,
+]
+
+def migrate_schema(bind):
+    """Create missing tables and apply pending migrations; safe to run from several workers at once"""
+    Base.metadata.create_all(bind=bind)
+    is_sqlite = bind.dialect.name == "sqlite"
+    with bind.execution_options(sqlite_begin="IMMEDIATE").begin() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar() if is_sqlite else 0
+        for step in MIGRATIONS[version:]:
+            step(conn)
+        if is_sqlite and version < len(MIGRATIONS):
+            conn.exec_driver_sql(f"PRAGMA user_version = {len(MIGRATIONS)}")
+        create_missing_indexes(conn)
+
+# Importing this module doesn't touch the database; prepare_database() runs before the app
+# serves. serve.py calls it once before forking workers, which inherit the flag; otherwise
+# the startup hook does it (concurrent runs from uvicorn --workers are safe, just wasted).
+database_prepared = False
+
+def prepare_database():
+    """Create tables, apply migrations and set up mentor search"""
+    global database_prepared
+    migrate_schema(engine)
+    install_mentor_search(engine)
+    database_prepared = True
 
 # Pydantic Models
 class SignupRequest(BaseModel):
@@ -111,6 +763,9 @@ class UserProfile(BaseModel):
     role: str
     profile: ProfileDetails
 
+class MentorRecommendation(UserProfile):
+    matchedSkills: List[str]
+
 class UpdateProfileRequest(BaseModel):
     id: int
     name: str = Field(..., min_length=1, max_length=100)
@@ -144,12 +799,27 @@ class MatchRequestResponse(BaseModel):
     menteeId: int
     message: str
     status: str
+    updatedAt: Optional[datetime] = None
+
+class MatchRequestIncoming(MatchRequestResponse):
+    menteeProfile: Optional[ProfileDetails] = None  # only with ?embed=profile
 
 class MatchRequestOutgoing(BaseModel):
     id: int
     mentorId: int
     menteeId: int
     status: str
+    updatedAt: Optional[datetime] = None
+    mentorProfile: Optional[ProfileDetails] = None  # only with ?embed=profile
+
+# Incoming/outgoing list paging and filters
+MATCH_REQUESTS_PAGE_MAX = 100
+MATCH_REQUEST_STATUSES = ("pending", "accepted", "rejected", "cancelled")
+
+# /api/mentors paging and projection
+MENTORS_PAGE_MAX = 100
+USERS_BATCH_MAX = 100  # ids per /api/users lookup
+MENTOR_FIELDS = ("email", "name", "bio", "imageUrl", "skills")
 
 class ErrorResponse(BaseModel):
     error: str
@@ -172,8 +842,224 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 # Create API router
+API_PREFIX = "/api"
 api_router = APIRouter()
 
+# Admission control
+class TokenBuckets:
+    """One token bucket per key, refilled at rate tokens per second up to burst"""
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, monotonic time of last update)
+
+    def take(self, key) -> float:
+        """Spend a token for key; returns 0 when allowed, else seconds until one is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class ConcurrencyLimiter:
+    """At most limit requests at once; up to queue more wait in FIFO order for max_wait seconds"""
+
+    def __init__(self, limit: int, queue: int, max_wait: float):
+        self.limit = limit
+        self.queue = queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters = deque()
+        self._service_seconds = 0.0  # moving average time a request holds its slot
+        self.admitted = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def retry_after(self) -> float:
+        """Rough time for the current line to drain"""
+        return self._service_seconds * (len(self._waiters) + 1) / self.limit
+
+    async def acquire(self) -> float:
+        """Take a slot and return the seconds spent waiting for it; raises Overloaded instead
+        of queueing past the limit or waiting longer than max_wait"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return 0.0
+        if len(self._waiters) >= self.queue:
+            self.rejected += 1
+            raise Overloaded("queue_full", self.retry_after())
+        started_at = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.rejected += 1
+            raise Overloaded("queue_timeout", self.retry_after())
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release(0.0)  # the slot was handed over just as the client went away
+            else:
+                self._discard(waiter)
+            raise
+        waited = time.perf_counter() - started_at
+        self.admitted += 1
+        self._wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        return waited
+
+    def release(self, held_seconds: float):
+        self._service_seconds += (held_seconds - self._service_seconds) * 0.1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # hand the slot straight to the next in line
+                return
+        self.active -= 1
+
+    def _discard(self, waiter):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_seconds / self.admitted * 1000, 3) if self.admitted else 0.0,
+            "max_wait_ms": round(self._max_wait_seconds * 1000, 3),
+            "avg_service_ms": round(self._service_seconds * 1000, 3),
+        }
+
+class AdmissionControl:
+    """Rate limits per client address and per user, and concurrency limits per expensive route"""
+
+    def __init__(self):
+        self.ip_buckets = TokenBuckets(RATE_LIMIT_IP_PER_SECOND, RATE_LIMIT_IP_BURST, RATE_LIMIT_MAX_CLIENTS)
+        self.user_buckets = TokenBuckets(RATE_LIMIT_USER_PER_SECOND, RATE_LIMIT_USER_BURST, RATE_LIMIT_MAX_CLIENTS)
+        self.limiters = {
+            route: ConcurrencyLimiter(ADMISSION_CONCURRENCY, ADMISSION_QUEUE, ADMISSION_MAX_WAIT_SECONDS)
+            for route in ADMISSION_ROUTES
+        } if ADMISSION_CONCURRENCY > 0 else {}
+        self.rejected = Counter()
+
+    def stats(self) -> dict:
+        return {
+            "rejected": dict(self.rejected),
+            "tracked_addresses": len(self.ip_buckets),
+            "tracked_users": len(self.user_buckets),
+            "routes": {route: limiter.stats() for route, limiter in self.limiters.items()},
+        }
+
+admission_control = AdmissionControl()
+
+def bearer_user_id(scope) -> Optional[str]:
+    """User id of a valid bearer token, or None; invalid tokens are left for the route to reject"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                return decode_access_token(token.strip()).get("sub")
+            except Exception:
+                return None
+    return None
+
+class AdmissionMiddleware:
+    """Sheds /api requests before they reach a route: 429 when a client or user is over its
+    rate limit, 503 when an expensive route's line is full or too slow. Both say when to
+    retry in Retry-After.
+
+    Registered before CORSMiddleware so it runs inside it and rejections keep their CORS
+    headers. Time spent in line is reported as admission_queue_wait_seconds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def reject(self, scope, receive, send, status_code: int, reason: str, detail: str, retry_after: float):
+        admission_control.rejected[reason] += 1
+        metrics.inc("admission_rejected_total", (("reason", reason),))
+        # Let the request metrics file the rejection under its route template. Included
+        # routers only resolve their routes while handling, so match api_router's directly.
+        path = scope["path"][len(API_PREFIX):]
+        for route in api_router.routes:
+            match, child_scope = route.matches({**scope, "path": path})
+            if match == Match.FULL:
+                scope.update(child_scope, route=route)
+                break
+        response = Response(
+            content=json.dumps({"detail": detail}),
+            status_code=status_code,
+            media_type="application/json",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(API_PREFIX + "/"):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        wait = admission_control.ip_buckets.take(client[0] if client else None)
+        if wait:
+            await self.reject(scope, receive, send, 429, "ip_rate", "Too many requests", wait)
+            return
+        user_id = bearer_user_id(scope) if admission_control.user_buckets.rate > 0 else None
+        if user_id is not None:
+            wait = admission_control.user_buckets.take(user_id)
+            if wait:
+                await self.reject(scope, receive, send, 429, "user_rate", "Too many requests", wait)
+                return
+
+        route = f"{scope['method']} {scope['path']}"
+        limiter = admission_control.limiters.get(route)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            waited = await limiter.acquire()
+        except Overloaded as e:
+            await self.reject(scope, receive, send, 503, e.reason, "Server is busy, please retry", e.retry_after)
+            return
+        metrics.observe("admission_queue_wait_seconds", (("route", route),), waited)
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started_at)
+
+app.add_middleware(AdmissionMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -183,21 +1069,154 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class MetricsMiddleware:
+    """Count requests and time them per route template, with the DB queries they ran.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so it adds a few microseconds, not a task.
+    Latency is measured to the response start, so event streams aren't timed by their lifetime.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._labels = {}
+        self._templates = {}  # id(route) -> full path template
+    
+    def route_template(self, scope) -> str:
+        # Unmatched paths share one label so scanners can't blow up the series count
+        route = scope.get("route")
+        if route is None:
+            # FastAPI's own /docs and /openapi.json only set the endpoint; their paths are fixed
+            return scope["path"] if "endpoint" in scope and not scope.get("path_params") else "unmatched"
+        template = self._templates.get(id(route))
+        if template is None:
+            # Routes of an included router don't carry its prefix; recover it from the request path
+            try:
+                rendered = route.path_format.format(**scope.get("path_params", {}))
+            except (AttributeError, KeyError, IndexError, ValueError):
+                rendered = ""
+            path = scope["path"]
+            prefix = path[:len(path) - len(rendered)] if rendered and path.endswith(rendered) else ""
+            template = self._templates[id(route)] = prefix + getattr(route, "path_format", "")
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started_at = time.perf_counter()
+        response = [500, None]  # status, seconds to response start
+        usage = [0, 0.0]
+        token = request_db_usage.set(usage)
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                response[0] = message["status"]
+                response[1] = time.perf_counter() - started_at
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_db_usage.reset(token)
+            key = (scope["method"], self.route_template(scope))
+            labels = self._labels.get(key)
+            if labels is None:
+                labels = self._labels[key] = (("method", key[0]), ("route", key[1]))
+            metrics.inc("http_requests_total", labels + (("status", str(response[0])),))
+            metrics.observe("http_request_duration_seconds", labels,
+                            response[1] if response[1] is not None else time.perf_counter() - started_at)
+            if usage[0]:
+                metrics.inc("db_queries_total", labels, usage[0])
+                metrics.inc("db_query_seconds_total", labels, usage[1])
+
+app.add_middleware(MetricsMiddleware)
+
 # Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """Run bcrypt in a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads scale with cores.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int):
+        self.context = context
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._calls = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+        self._max_run_seconds = 0.0
+
+    def _run(self, submitted_at: float, func, *args):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                self._running -= 1
+                self._calls += 1
+                self._wait_seconds += started_at - submitted_at
+                self._run_seconds += elapsed
+                self._max_run_seconds = max(self._max_run_seconds, elapsed)
+                metrics.observe("password_hash_seconds", (("operation", func.__name__),), elapsed)
+
+    def _on_done(self, future):
+        # A job cancelled before it started never reaches _run
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            self._queued += 1
+        future = self._executor.submit(self._run, time.perf_counter(), func, *args)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str):
+        """Return (valid, new_hash); new_hash is set when the stored hash is outdated."""
+        return await self._submit(self.context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self._calls
+            return {
+                "workers": self.max_workers,
+                "rounds": BCRYPT_ROUNDS,
+                "queue_depth": self._queued,
+                "in_flight": self._running,
+                "calls": calls,
+                "avg_wait_ms": round(self._wait_seconds / calls * 1000, 3) if calls else 0.0,
+                "avg_run_ms": round(self._run_seconds / calls * 1000, 3) if calls else 0.0,
+                "max_run_ms": round(self._max_run_seconds * 1000, 3),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher(pwd_context, PASSWORD_HASH_WORKERS)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -222,19 +1241,86 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+class TTLCache:
+    """Small LRU whose entries also expire after a fixed time"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, ttl: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# Keyed by the whole token string: it embeds the jti and the signature, so a
+# forged token can never hit another token's entry.
+token_cache = TTLCache(TOKEN_CACHE_MAX_ENTRIES, TOKEN_CACHE_TTL)
+user_cache = TTLCache(USER_CACHE_MAX_ENTRIES, USER_CACHE_TTL)
+
+class TokenUser:
+    """Identity taken from verified token claims, for routes that don't need the users row"""
+    __slots__ = ("id", "role", "name", "email")
+
+    def __init__(self, claims: dict):
+        self.id = int(claims["sub"])
+        self.role = claims.get("role")
+        self.name = claims.get("name")
+        self.email = claims.get("email")
+
+def decode_access_token(token: str) -> dict:
+    """Verified claims of a token, from token_cache when it has been seen before"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    payload = jwt.decode(
+        token, 
+        SECRET_KEY, 
+        algorithms=[ALGORITHM],
+        audience="mentor-mentee-users",
+        issuer="mentor-mentee-app"
+    )
+    token_cache.put(token, payload, ttl=payload["exp"] - time.time())
+    return payload
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     if credentials is None:
         raise HTTPException(status_code=401, detail="Missing authorization header")
     
     try:
-        payload = jwt.decode(
-            credentials.credentials, 
-            SECRET_KEY, 
-            algorithms=[ALGORITHM],
-            audience="mentor-mentee-users",
-            issuer="mentor-mentee-app"
-        )
-        return payload
+        return decode_access_token(credentials.credentials)
     except ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except InvalidTokenError:
@@ -242,12 +1328,925 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     except Exception:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
 
-def get_current_user(db: Session = Depends(get_db), token_data: dict = Depends(verify_token)):
-    user = db.query(User).filter(User.id == int(token_data.get("sub"))).first()
+async def get_token_user(token_data: dict = Depends(verify_token)) -> TokenUser:
+    """Role-gated routes trust the verified claims; users are never deleted and roles never change"""
+    try:
+        return TokenUser(token_data)
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+async def get_stream_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    access_token: Optional[str] = Query(None)) -> TokenUser:
+    """Like get_token_user, but EventSource can't send headers so the token may come as ?access_token="""
+    if credentials is None and access_token:
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=access_token)
+    return await get_token_user(await verify_token(credentials))
+
+async def get_current_user(db: AsyncSession = Depends(get_db), token_user: TokenUser = Depends(get_token_user)):
+    user = await db.scalar(select(User).where(User.id == token_user.id))
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
+# Profile image helpers
+def decode_image_data(value: str) -> bytes:
+    """Decode a data URL or plain base64 string into raw image bytes"""
+    if value.startswith('data:image/'):
+        if ',' not in value:
+            raise ValueError("Invalid data URL format")
+        return base64.b64decode(value.split(',')[1], validate=True)
+    return base64.b64decode(value, validate=True)
+
+def detect_image_content_type(data: bytes) -> str:
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return "image/png"
+    if data.startswith(b'\xff\xd8\xff'):
+        return "image/jpeg"
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return "image/webp"
+    return "application/octet-stream"
+
+async def store_profile_image(db: AsyncSession, data: bytes) -> str:
+    """Store image bytes under their SHA-256 hash, once, and return the hash"""
+    digest = hashlib.sha256(data).hexdigest()
+    if await db.scalar(select(ProfileImage.hash).where(ProfileImage.hash == digest)) is None:
+        db.add(ProfileImage(
+            hash=digest,
+            content_type=detect_image_content_type(data),
+            size=len(data),
+            data=data
+        ))
+    return digest
+
+def render_image_variants(data: bytes) -> list:
+    """Resize and encode every configured variant as (size, format, bytes); runs in a worker process"""
+    from PIL import Image, features
+    image = Image.open(io.BytesIO(data))
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    formats = [fmt for fmt in IMAGE_VARIANT_FORMATS if fmt != "webp" or features.check("webp")]
+    variants = []
+    for size in IMAGE_VARIANT_SIZES:
+        # Uploads are validated square, so a plain resize keeps the aspect ratio
+        resized = image.resize((size, size), Image.LANCZOS)
+        for fmt in formats:
+            out = io.BytesIO()
+            if fmt == "jpeg":
+                resized.convert("RGB").save(out, "JPEG", quality=85, optimize=True, progressive=True)
+            else:
+                resized.save(out, "WEBP", quality=80, method=4)
+            variants.append((size, fmt, out.getvalue()))
+    return variants
+
+_image_executor = None
+
+def get_image_executor() -> ProcessPoolExecutor:
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ProcessPoolExecutor(max_workers=max(1, IMAGE_WORKERS))
+    return _image_executor
+
+async def check_profile_image(data: bytes) -> list:
+    """Validate an uploaded avatar and render its variants in the image worker pool, so
+    neither blocks the event loop; returns the variants or raises a 400 HTTPException"""
+    if not PIL_AVAILABLE:
+        if len(data) < 100:  # Too small to be a valid image
+            raise HTTPException(status_code=400, detail="Invalid image data")
+        return []
+    loop = asyncio.get_running_loop()
+    started_at = time.perf_counter()
+    try:
+        return await loop.run_in_executor(get_image_executor(), process_profile_image, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        metrics.observe("image_processing_seconds", (("stage", "upload"),), time.perf_counter() - started_at)
+
+async def store_image_variants(db: AsyncSession, image_hash: str, variants: list):
+    existing = set((await db.execute(
+        select(ProfileImageVariant.size, ProfileImageVariant.format)
+        .where(ProfileImageVariant.image_hash == image_hash)
+    )).all())
+    for size, fmt, data in variants:
+        if (size, fmt) in existing:
+            continue
+        db.add(ProfileImageVariant(
+            image_hash=image_hash,
+            size=size,
+            format=fmt,
+            variant_hash=await store_profile_image(db, data)
+        ))
+
+def process_profile_image(data: bytes) -> list:
+    """Validate an uploaded avatar and render its variants; runs in a worker process.
+    Raises ValueError with a client-facing message when the image is rejected."""
+    from PIL import Image
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Exception:
+        raise ValueError("Invalid image format")
+    if image.format not in ("JPEG", "PNG"):
+        raise ValueError("Image must be JPEG or PNG format")
+    width, height = image.size
+    if width != height:
+        raise ValueError("Image must be square")
+    if width < 500 or width > 1000:
+        raise ValueError("Image must be between 500x500 and 1000x1000 pixels")
+    try:
+        image.verify()
+    except Exception:
+        raise ValueError("Invalid image format")
+    try:
+        return render_image_variants(data)
+    except Exception as e:
+        # Variants are an optimization; the original is still served
+        print(f"Warning: could not render image variants: {e}")
+        return []
+
+class ImageUploadParser:
+    """Incremental multipart/form-data parser that keeps only the "image" file part.
+
+    Other parts are discarded as they stream past. The image is rejected with an
+    HTTPException as soon as its first bytes aren't a JPEG/PNG signature or it grows
+    past max_bytes, so an oversized or wrong upload is never read to the end."""
+
+    SNIFF_BYTES = 8  # long enough for the PNG signature
+
+    def __init__(self, boundary: bytes, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.data = bytearray()
+        self.found = False
+        self.sniffed = False
+        self._in_image = False
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._disposition = b""
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def write(self, chunk: bytes):
+        self._parser.write(chunk)
+
+    def finish(self) -> bytearray:
+        self._parser.finalize()
+        if not self.found or not self.data:
+            raise HTTPException(status_code=400, detail="Missing image file")
+        self._sniff()
+        return self.data
+
+    def _on_part_begin(self):
+        self._disposition = b""
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        self._in_image = options.get(b"name") == b"image" and not self.found
+        self.found = self.found or self._in_image
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if not self._in_image:
+            return
+        if len(self.data) + (end - start) > self.max_bytes:
+            raise HTTPException(status_code=413, detail="Image must be less than 1MB")
+        self.data += data[start:end]
+        if not self.sniffed and len(self.data) >= self.SNIFF_BYTES:
+            self._sniff()
+
+    def _on_part_end(self):
+        self._in_image = False
+
+    def _sniff(self):
+        self.sniffed = True
+        if detect_image_content_type(self.data[:self.SNIFF_BYTES]) not in ("image/jpeg", "image/png"):
+            raise HTTPException(status_code=400, detail="Image must be JPEG or PNG format")
+
+def pick_variant_size(requested: Optional[int]) -> int:
+    """Smallest variant at least as large as requested, else the largest"""
+    if requested:
+        for size in sorted(IMAGE_VARIANT_SIZES):
+            if size >= requested:
+                return size
+    return max(IMAGE_VARIANT_SIZES)
+
+class ImageCache:
+    """In-process LRU of decoded image bytes keyed by content hash, capped by total size.
+
+    Also remembers which hash each user currently points at for a short TTL, so
+    hot images are served without touching the database.
+    """
+
+    def __init__(self, max_bytes: int, owner_ttl: float):
+        self.max_bytes = max_bytes
+        self.owner_ttl = owner_ttl
+        self._images = OrderedDict()  # hash -> (data, content_type)
+        self._owners = {}  # user_id -> (hash or "" for no image, expires_at)
+        self._variants = OrderedDict()  # (hash, size, format) -> variant hash or "" if missing
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_owner(self, user_id: int) -> Optional[str]:
+        entry = self._owners.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def set_owner(self, user_id: int, image_hash: Optional[str]):
+        self._owners[user_id] = (image_hash or "", time.monotonic() + self.owner_ttl)
+
+    def get_variant(self, key: tuple) -> Optional[str]:
+        return self._variants.get(key)
+
+    def set_variant(self, key: tuple, variant_hash: Optional[str]):
+        # Variants of a hash never change, so only the count needs bounding
+        self._variants[key] = variant_hash or ""
+        if len(self._variants) > 10000:
+            self._variants.popitem(last=False)
+
+    def get(self, image_hash: str):
+        entry = self._images.get(image_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._images.move_to_end(image_hash)
+        self.hits += 1
+        return entry
+
+    def put(self, image_hash: str, data: bytes, content_type: str):
+        entry = (data, content_type)
+        if len(data) > self.max_bytes or image_hash in self._images:
+            return entry
+        self._images[image_hash] = entry
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, (evicted, _) = self._images.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+        return entry
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._images),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+image_cache = ImageCache(IMAGE_CACHE_MAX_BYTES, IMAGE_OWNER_TTL_SECONDS)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def profile_image_url(role: str, user_id: int, image_hash: Optional[str]) -> str:
+    """Image URL pinned to the current image with ?v=, so clients can cache it as immutable"""
+    url = f"/api/images/{role}/{user_id}"
+    return f"{url}?v={image_hash[:IMAGE_VERSION_MIN_LENGTH]}" if image_hash else url
+
+async def replace_mentor_skills(db: AsyncSession, user_id: int, skills: List[str]):
+    await db.execute(delete(MentorSkill).where(MentorSkill.user_id == user_id))
+    rows = mentor_skill_rows(user_id, skills)
+    if rows:
+        await db.execute(insert(MentorSkill), rows)
+
+# Allowed types of each cursor key value per order, checked before a key reaches SQL
+CURSOR_KEY_TYPES = {
+    "id": ((int,),),
+    "updated": ((str,), (int,)),
+    "name": ((str, type(None)), (int,)),
+    "skill": ((str, type(None)), (int,)),
+    "rank": ((int, float), (int,)),
+}
+
+def encode_cursor(order: str, key: list) -> str:
+    """Opaque keyset cursor: the sort key of the last row on the page"""
+    raw = json.dumps({"o": order, "k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, order: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        key, types = data["k"], CURSOR_KEY_TYPES[order]
+        if data["o"] == order and isinstance(key, list) and len(key) == len(types) and all(
+            isinstance(value, allowed) and not isinstance(value, bool) for value, allowed in zip(key, types)
+        ):
+            return key
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+class MentorDirectoryCache:
+    """Serialized /api/mentors responses, valid for one directory version"""
+
+    def __init__(self, max_entries: int, version_ttl: float):
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self.version = None
+        self.updated_at = None
+        self._checked_at = 0.0
+        self._entries = OrderedDict()  # key -> (body, headers)
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self._rebuild_seconds = 0.0
+        self._max_rebuild_seconds = 0.0
+
+    async def current_version(self, db: AsyncSession):
+        if self.version is None or time.monotonic() - self._checked_at > self.version_ttl:
+            row = (await db.execute(
+                select(DirectoryState.version, DirectoryState.updated_at).where(DirectoryState.name == "mentors")
+            )).first()
+            version, updated_at = row if row else (0, datetime.utcnow())
+            if version != self.version:
+                self._entries.clear()
+                self.version, self.updated_at = version, updated_at
+            self._checked_at = time.monotonic()
+        return self.version, self.updated_at
+
+    def invalidate(self):
+        """Force a version check on the next request after a local write"""
+        self._checked_at = 0.0
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: tuple, body: bytes, headers: dict, rebuild_seconds: float):
+        self.rebuilds += 1
+        self._rebuild_seconds += rebuild_seconds
+        self._max_rebuild_seconds = max(self._max_rebuild_seconds, rebuild_seconds)
+        entry = (body, headers)
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "rebuilds": self.rebuilds,
+            "avg_rebuild_ms": round(self._rebuild_seconds / self.rebuilds * 1000, 3) if self.rebuilds else 0.0,
+            "max_rebuild_ms": round(self._max_rebuild_seconds * 1000, 3),
+        }
+
+mentor_directory_cache = MentorDirectoryCache(MENTOR_CACHE_MAX_ENTRIES, MENTOR_CACHE_VERSION_TTL)
+
+async def bump_directory_version(db: AsyncSession, name: str = "mentors") -> int:
+    """Call inside the write transaction that changes what /api/mentors returns
+    ("mentors") or which mentors have an accepted mentee ("mentor_availability")"""
+    return await db.scalar(
+        update(DirectoryState)
+        .where(DirectoryState.name == name)
+        .values(version=DirectoryState.version + 1, updated_at=datetime.utcnow())
+        .returning(DirectoryState.version)
+    )
+
+# Mentor recommendation index
+class MentorRecord:
+    __slots__ = ("id", "email", "name", "bio", "image_hash", "skills", "keys")
+
+    def __init__(self, mentor_id: int, email: str, name: str, bio: str, image_hash: Optional[str], skills: List[str]):
+        self.id = mentor_id
+        self.email = email
+        self.name = name
+        self.bio = bio
+        self.image_hash = image_hash
+        self.skills = tuple(skills)
+        self.keys = tuple(dict.fromkeys(normalize_skill(skill) for skill in skills if skill.strip()))
+
+def slot_bitset(slots: List[int], size: int) -> int:
+    """Python int with bit n set for every slot n"""
+    bits = bytearray((size + 7) // 8)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+class MentorIndex:
+    """Read-optimized snapshot of every mentor for skill-overlap recommendations.
+
+    Mentors sit in slots in id order. Each normalized skill maps to a bitset of the
+    slots that list it, and one more bitset holds the mentors without an accepted
+    mentee. A query costs a few big-int operations per requested skill, however many
+    mentors match. Writes made by this process patch the snapshot when they commit;
+    directory_state versions this process didn't write itself mean another worker
+    changed something, and the snapshot is rebuilt in the background while the old
+    one keeps answering.
+    """
+
+    STATES = ("mentors", "mentor_availability")
+    WINDOW_BITS = 2048
+
+    def __init__(self, version_ttl: float):
+        self.version_ttl = version_ttl
+        self.versions = None  # directory_state versions the snapshot reflects
+        self.records = []
+        self.slots = {}  # mentor id -> slot
+        self.postings = {}  # normalized skill -> bitset of slots
+        self.available = 0
+        self.full = 0  # every slot
+        self._checked_at = 0.0
+        self._rebuild = None
+        self.queries = 0
+        self.incremental_updates = 0
+        self.rebuilds = 0
+        self._last_rebuild_seconds = 0.0
+
+    def start(self):
+        """Build the first snapshot in the background instead of on the first query"""
+        if self._rebuild is None and self.versions is None:
+            self._rebuild = asyncio.create_task(self._run_rebuild())
+
+    async def stop(self):
+        task = self._rebuild
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def ensure_current(self, db: AsyncSession):
+        if self.versions is not None and time.monotonic() - self._checked_at <= self.version_ttl:
+            return
+        if self.versions is not None:
+            stored = dict((await db.execute(
+                select(DirectoryState.name, DirectoryState.version).where(DirectoryState.name.in_(self.STATES))
+            )).all())
+            self._checked_at = time.monotonic()
+            if stored == self.versions:
+                return
+        if self._rebuild is None:
+            self._rebuild = asyncio.create_task(self._run_rebuild())
+        if self.versions is None:
+            await asyncio.shield(self._rebuild)
+            if self.versions is None:
+                raise HTTPException(status_code=503, detail="Mentor index is not available")
+
+    async def _run_rebuild(self):
+        started_at = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                async with db.begin():
+                    # One read transaction, so the versions match the rows
+                    versions = dict((await db.execute(
+                        select(DirectoryState.name, DirectoryState.version).where(DirectoryState.name.in_(self.STATES))
+                    )).all())
+                    mentors = (await db.execute(
+                        select(User.id, User.email, User.name, User.bio, User.profile_image_hash, User.skills)
+                        .where(User.role == "mentor")
+                        .order_by(User.id)
+                    )).all()
+                    taken = set((await db.scalars(
+                        select(MatchRequest.mentor_id).where(MatchRequest.status == "accepted")
+                    )).all())
+            # Parsing 100k skill lists takes a while; keep it off the event loop
+            snapshot = await asyncio.to_thread(self._build, mentors, taken)
+            self.records, self.slots, self.postings, self.available = snapshot
+            self.full = (1 << len(self.records)) - 1
+            self.versions = versions
+            self._checked_at = time.monotonic()
+            self.rebuilds += 1
+            self._last_rebuild_seconds = time.perf_counter() - started_at
+        except Exception as e:
+            print(f"Warning: mentor index rebuild failed: {e}")
+        finally:
+            self._rebuild = None
+
+    @staticmethod
+    def _build(mentors, taken: set):
+        records, slots, members, free = [], {}, {}, []
+        for slot, row in enumerate(mentors):
+            record = MentorRecord(row.id, row.email, row.name or "", row.bio or "", row.profile_image_hash,
+                                  load_skills(row.skills))
+            records.append(record)
+            slots[row.id] = slot
+            for key in record.keys:
+                members.setdefault(key, []).append(slot)
+            if row.id not in taken:
+                free.append(slot)
+        size = len(records)
+        postings = {key: slot_bitset(members[key], size) for key in members}
+        return records, slots, postings, slot_bitset(free, size)
+
+    def _apply(self, name: str, version: int, change, *args):
+        """Patch the snapshot after this process committed directory_state[name] = version"""
+        if self.versions is None:
+            return  # the first build reads the committed rows
+        change(*args)
+        self.incremental_updates += 1
+        if self.versions.get(name) == version - 1:
+            self.versions[name] = version
+        # Otherwise a write from elsewhere came in between and the next check rebuilds
+
+    def mentor_changed(self, version: int, mentor_id: int, email: str, name: str, bio: str,
+                       image_hash: Optional[str], skills: List[str]):
+        self._apply("mentors", version, self._upsert,
+                    MentorRecord(mentor_id, email, name or "", bio or "", image_hash, skills))
+
+    def availability_changed(self, version: int, mentor_id: int, available: bool):
+        self._apply("mentor_availability", version, self._set_available, mentor_id, available)
+
+    def _upsert(self, record: MentorRecord):
+        slot = self.slots.get(record.id)
+        if slot is None:
+            slot = len(self.records)
+            self.records.append(record)
+            self.slots[record.id] = slot
+            self.available |= 1 << slot  # a new mentor has no accepted mentee yet
+            self.full |= 1 << slot
+        else:
+            for key in self.records[slot].keys:
+                self.postings[key] &= ~(1 << slot)
+                if not self.postings[key]:
+                    del self.postings[key]
+            self.records[slot] = record
+        for key in record.keys:
+            self.postings[key] = self.postings.get(key, 0) | 1 << slot
+
+    def _set_available(self, mentor_id: int, available: bool):
+        slot = self.slots.get(mentor_id)
+        if slot is None:
+            return
+        if available:
+            self.available |= 1 << slot
+        else:
+            self.available &= ~(1 << slot)
+
+    def recommend(self, keys: List[str], limit: int) -> List[tuple]:
+        """(record, overlap) for up to limit available mentors sharing at least one of
+        the normalized skills, most shared skills first, then newest mentor first"""
+        self.queries += 1
+        postings = [self.postings[key] & self.available for key in keys if key in self.postings]
+        # Bit-sliced counters: bit n of planes[i] is bit i of slot n's overlap count
+        planes = []
+        for bits in postings:
+            carry = bits
+            for i, plane in enumerate(planes):
+                planes[i], carry = plane ^ carry, plane & carry
+                if not carry:
+                    break
+            if carry:
+                planes.append(carry)
+        # Complements are taken against the all-slots mask: negative big ints are slow
+        complements = [plane ^ self.full for plane in planes]
+        results = []
+        # len(planes) planes hold counts up to 2**len(planes) - 1; anything higher would alias
+        for overlap in range(min(len(postings), (1 << len(planes)) - 1), 0, -1):
+            mask = self.full
+            for i, plane in enumerate(planes):
+                mask &= plane if overlap >> i & 1 else complements[i]
+            # Highest slot first: bit_length() is O(1) where finding the lowest set bit is
+            # not, and peeling bits off a small top window keeps each step off the full int
+            while mask:
+                base = max(0, mask.bit_length() - self.WINDOW_BITS)
+                window = mask >> base
+                while window:
+                    bit = window.bit_length() - 1
+                    results.append((self.records[base + bit], overlap))
+                    if len(results) >= limit:
+                        return results
+                    window ^= 1 << bit
+                mask &= (1 << base) - 1
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "mentors": len(self.records),
+            "available": self.available.bit_count(),
+            "skills": len(self.postings),
+            "versions": self.versions,
+            "queries": self.queries,
+            "incremental_updates": self.incremental_updates,
+            "rebuilds": self.rebuilds,
+            "last_rebuild_ms": round(self._last_rebuild_seconds * 1000, 3),
+        }
+
+mentor_index = MentorIndex(MENTOR_CACHE_VERSION_TTL)
+
+# Match request events
+class MatchEventBroker(ABC):
+    """Fans match request events out to the SSE streams of their mentor and mentee.
+
+    Subclasses decide how events are numbered, kept for Last-Event-ID resume and
+    shared between workers; this class handles the subscribers of this process.
+    """
+
+    def __init__(self):
+        self._subscribers = {}  # user_id -> set of asyncio.Queue
+        self.published = 0
+        self.delivered = 0
+        self.disconnected = 0
+
+    @abstractmethod
+    async def publish(self, db: AsyncSession, event: dict):
+        """Call inside the write transaction that made the change"""
+
+    @abstractmethod
+    async def history(self, user_id: int, after_id: int):
+        """Events for user_id newer than after_id, or None if they are no longer kept"""
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def deliver(self, event_id: int, event: dict):
+        for user_id in {event["mentorId"], event["menteeId"]}:
+            for queue in self._subscribers.get(user_id, ()):
+                try:
+                    queue.put_nowait((event_id, event))
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    # Stalled client: end its stream; it reconnects with Last-Event-ID
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(None)
+                    self.disconnected += 1
+
+    def stats(self) -> dict:
+        return {
+            "broker": type(self).__name__,
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "disconnected": self.disconnected,
+        }
+
+class LocalMatchEventBroker(MatchEventBroker):
+    """Events numbered and buffered in this process; only correct with a single worker"""
+
+    def __init__(self, buffer_size: int):
+        super().__init__()
+        # Seeded from the clock so ids keep increasing across restarts
+        self._last_id = time.time_ns() // 1000
+        self._recent = deque(maxlen=buffer_size)
+
+    async def publish(self, db: AsyncSession, event: dict):
+        after_commit(db, lambda: self._append(event))
+
+    def _append(self, event: dict):
+        self._last_id += 1
+        self.published += 1
+        self._recent.append((self._last_id, event))
+        self.deliver(self._last_id, event)
+
+    async def history(self, user_id: int, after_id: int):
+        oldest = self._recent[0][0] if self._recent else self._last_id + 1
+        if after_id < oldest - 1 or after_id > self._last_id:
+            return None
+        return [
+            (event_id, event) for event_id, event in self._recent
+            if event_id > after_id and user_id in (event["mentorId"], event["menteeId"])
+        ]
+
+class DatabaseMatchEventBroker(MatchEventBroker):
+    """Shares events between workers through the match_events table.
+
+    A stand-in for an external broker: events are written in the same transaction
+    as the change, and each worker polls for rows it has not delivered yet.
+    """
+
+    PRUNE_INTERVAL = 60.0
+    REPLAY_MAX = SSE_QUEUE_SIZE * 10  # missed events replayed on reconnect; more means resync
+
+    def __init__(self, poll_seconds: float, retention_seconds: float):
+        super().__init__()
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self._cursor = None
+        self._task = None
+        self._wake = None
+        self._pruned_at = 0.0
+
+    async def publish(self, db: AsyncSession, event: dict):
+        await db.execute(insert(MatchEvent).values(
+            mentor_id=event["mentorId"],
+            mentee_id=event["menteeId"],
+            payload=json.dumps(event),
+            created_at=datetime.utcnow()
+        ))
+        self.published += 1
+        if self._wake is not None:
+            after_commit(db, self._wake.set)
+
+    async def start(self):
+        if self._task is not None:
+            return
+        async with AsyncSessionLocal() as db:
+            self._cursor = await db.scalar(select(func.max(MatchEvent.id))) or 0
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _poll(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                async with AsyncSessionLocal() as db:
+                    rows = (await db.execute(
+                        select(MatchEvent.id, MatchEvent.payload)
+                        .where(MatchEvent.id > self._cursor)
+                        .order_by(MatchEvent.id)
+                        .limit(1000)
+                    )).all()
+                    for event_id, payload in rows:
+                        # Advance first, so an event that can't be delivered is skipped, not retried forever
+                        self._cursor = event_id
+                        self.deliver(event_id, json.loads(payload))
+                    if time.monotonic() - self._pruned_at > self.PRUNE_INTERVAL:
+                        self._pruned_at = time.monotonic()
+                        async with write_transaction(db):
+                            await db.execute(delete(MatchEvent).where(
+                                MatchEvent.created_at < datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+                            ))
+            except Exception as e:
+                # Anything escaping here would end the task and silently stop every stream on this worker
+                print(f"Warning: match event poll failed ({type(e).__name__}: {e})")
+
+    async def history(self, user_id: int, after_id: int):
+        async with AsyncSessionLocal() as db:
+            oldest = await db.scalar(select(func.min(MatchEvent.id)))
+            if oldest is not None and after_id < oldest - 1:
+                return None
+            rows = (await db.execute(
+                select(MatchEvent.id, MatchEvent.payload)
+                .where(MatchEvent.id > after_id, or_(MatchEvent.mentor_id == user_id, MatchEvent.mentee_id == user_id))
+                .order_by(MatchEvent.id)
+                .limit(self.REPLAY_MAX + 1)
+            )).all()
+        if len(rows) > self.REPLAY_MAX:
+            # A truncated backlog would lose the gap for good; make the client reload instead
+            return None
+        return [(event_id, json.loads(payload)) for event_id, payload in rows]
+
+    def stats(self) -> dict:
+        return {**super().stats(), "cursor": self._cursor}
+
+MATCH_EVENT_BROKERS = {
+    "local": lambda: LocalMatchEventBroker(MATCH_EVENT_BUFFER),
+    "database": lambda: DatabaseMatchEventBroker(MATCH_EVENT_POLL_SECONDS, MATCH_EVENT_RETENTION_SECONDS),
+}
+
+if MATCH_EVENT_BROKER not in MATCH_EVENT_BROKERS:
+    raise ValueError(f"MATCH_EVENT_BROKER must be one of {sorted(MATCH_EVENT_BROKERS)}")
+match_events = MATCH_EVENT_BROKERS[MATCH_EVENT_BROKER]()
+
+# Match request archiving
+class MatchRequestArchiver:
+    """Moves old rejected/cancelled requests to match_requests_archive in small batches.
+
+    Each batch is its own short write transaction, so request handlers queue behind
+    at most one batch rather than the whole run.
+    """
+
+    TERMINAL = ("rejected", "cancelled")
+
+    def __init__(self, after_days: float, interval: float, batch_size: int):
+        self.after_days = after_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task = None
+        self.runs = 0
+        self.archived = 0
+        self._last_run_seconds = 0.0
+        self._max_batch_seconds = 0.0
+
+    async def archive_batch(self, db: AsyncSession, cutoff: datetime) -> int:
+        # Never archive the newest row: SQLite hands out max(id) + 1, so deleting it
+        # would let the next request reuse an id that already exists in the archive
+        newest = select(func.max(MatchRequest.id)).scalar_subquery()
+        eligible = and_(
+            MatchRequest.status.in_(self.TERMINAL),
+            MatchRequest.updated_at < cutoff,
+            MatchRequest.id < newest
+        )
+        # Pick the batch before taking the write lock
+        ids = (await db.scalars(select(MatchRequest.id).where(eligible).limit(self.batch_size))).all()
+        if not ids:
+            return 0
+        started_at = time.perf_counter()
+        async with write_transaction(db):
+            batch = and_(MatchRequest.id.in_(ids), eligible)
+            await db.execute(insert(MatchRequestArchive).from_select(
+                ["id", "mentor_id", "mentee_id", "message", "status", "created_at", "updated_at", "archived_at"],
+                select(
+                    MatchRequest.id, MatchRequest.mentor_id, MatchRequest.mentee_id, MatchRequest.message,
+                    MatchRequest.status, MatchRequest.created_at, MatchRequest.updated_at, literal(datetime.utcnow())
+                ).where(batch)
+            ))
+            moved = (await db.execute(delete(MatchRequest).where(batch))).rowcount
+        self._max_batch_seconds = max(self._max_batch_seconds, time.perf_counter() - started_at)
+        return moved
+
+    async def run_once(self) -> int:
+        """Archive everything eligible now; returns the number of requests moved"""
+        started_at = time.perf_counter()
+        cutoff = datetime.utcnow() - timedelta(days=self.after_days)
+        total = 0
+        async with AsyncSessionLocal() as db:
+            while True:
+                moved = await self.archive_batch(db, cutoff)
+                total += moved
+                if moved < self.batch_size:
+                    break
+                await asyncio.sleep(ARCHIVE_BATCH_PAUSE_SECONDS)
+        self.runs += 1
+        self.archived += total
+        self._last_run_seconds = time.perf_counter() - started_at
+        return total
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except SQLAlchemyError as e:
+                print(f"Warning: archiving match requests failed ({e})")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "archived": self.archived,
+            "last_run_ms": round(self._last_run_seconds * 1000, 3),
+            "max_batch_ms": round(self._max_batch_seconds * 1000, 3),
+        }
+
+match_request_archiver = MatchRequestArchiver(ARCHIVE_AFTER_DAYS, ARCHIVE_INTERVAL_SECONDS, ARCHIVE_BATCH_SIZE)
+
+def format_sse(event_id: int, event_type: str, data: dict) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
+
 # Security helper functions
 def sanitize_input(text: str) -> str:
     """Sanitize input to prevent XSS attacks"""
@@ -272,21 +2271,78 @@ def validate_user_input(text: str, max_length: int = 1000) -> str:
     
     return sanitize_input(text)
 
+@app.on_event("startup")
+async def start_background_jobs():
+    if not database_prepared:
+        await asyncio.to_thread(prepare_database)
+    match_request_archiver.start()
+    mentor_index.start()
+    metrics.start()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    password_hasher.shutdown()
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=False, cancel_futures=True)
+    await match_events.stop()
+    await match_request_archiver.stop()
+    await mentor_index.stop()
+    await metrics.stop()
+    await async_engine.dispose()
+
 # Routes
 @app.get("/")
 async def root():
     return RedirectResponse(url="/docs")
 
+@app.get("/internal/stats", include_in_schema=False)
+async def internal_stats():
+    return {
+        "password_hashing": password_hasher.stats(),
+        "write_queue": write_queue.stats(),
+        "image_cache": image_cache.stats(),
+        "mentor_directory_cache": mentor_directory_cache.stats(),
+        "mentor_index": mentor_index.stats(),
+        "admission_control": admission_control.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "match_events": match_events.stats(),
+        "match_request_archiver": match_request_archiver.stats(),
+    }
+
+def collect_cache_metrics():
+    caches = {"image": image_cache, "mentor_directory": mentor_directory_cache, "token": token_cache, "user": user_cache}
+    for name, cache in caches.items():
+        stats = cache.stats()
+        labels = (("cache", name),)
+        yield "counter", "cache_hits_total", labels, stats["hits"]
+        yield "counter", "cache_misses_total", labels, stats["misses"]
+        yield "gauge", "cache_entries", labels, stats["entries"]
+
+def collect_worker_metrics():
+    yield "gauge", "password_hash_queue_depth", (), password_hasher.stats()["queue_depth"]
+    yield "gauge", "write_queue_depth", (), write_queue.stats()["queue_depth"]
+    for route, limiter in admission_control.limiters.items():
+        stats = limiter.stats()
+        yield "gauge", "admission_in_flight", (("route", route),), stats["active"]
+        yield "gauge", "admission_queue_depth", (("route", route),), stats["queued"]
+
+metrics.collectors += [collect_cache_metrics, collect_worker_metrics]
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
 @api_router.post("/signup", status_code=201)
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
+async def signup(request: SignupRequest, db: AsyncSession = Depends(get_db)):
     try:
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == request.email).first()
+        existing_user = await db.scalar(select(User).where(User.email == request.email))
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
         
         # Create new user
-        hashed_password = get_password_hash(request.password)
+        hashed_password = await password_hasher.hash(request.password)
         new_user = User(
             email=request.email,
             hashed_password=hashed_password,
@@ -296,28 +2352,47 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
             skills="[]" if request.role == "mentor" else None
         )
         
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        async with write_transaction(db):
+            db.add(new_user)
+            if new_user.role == "mentor":
+                version = await bump_directory_version(db)
+                after_commit(db, lambda: mentor_index.mentor_changed(
+                    version, new_user.id, new_user.email, new_user.name, new_user.bio, None, []))
+        if new_user.role == "mentor":
+            mentor_directory_cache.invalidate()
         
         return {"message": "User created successfully"}
     
+    except HTTPException:
+        raise
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Email already registered")
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @api_router.post("/login", response_model=LoginResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request.email).first()
-    if not user or not verify_password(request.password, user.hashed_password):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == request.email))
+    if not user:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    
+    valid, new_hash = await password_hasher.verify_and_update(request.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     
+    # Upgrade hashes created with a different bcrypt cost
+    if new_hash:
+        try:
+            async with write_transaction(db):
+                user.hashed_password = new_hash
+        except SQLAlchemyError:
+            await db.rollback()
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={
@@ -332,7 +2407,17 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
     return LoginResponse(token=access_token)
 
 @api_router.get("/me", response_model=UserProfile)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(db: AsyncSession = Depends(get_db), token_user: TokenUser = Depends(get_token_user)):
+    current_user = user_cache.get(token_user.id)
+    if current_user is None:
+        current_user = (await db.execute(
+            select(User.id, User.email, User.name, User.role, User.bio, User.profile_image_hash, User.skills)
+            .where(User.id == token_user.id)
+        )).first()
+        if current_user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.put(token_user.id, current_user)
+    
     skills = None
     if current_user.role == "mentor" and current_user.skills:
         try:
@@ -343,7 +2428,7 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
     profile = ProfileDetails(
         name=current_user.name or "",
         bio=current_user.bio or "",
-        imageUrl=f"/api/images/{current_user.role}/{current_user.id}",
+        imageUrl=profile_image_url(current_user.role, current_user.id, current_user.profile_image_hash),
         skills=skills
     )
     
@@ -355,80 +2440,64 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
     )
 
 @api_router.put("/profile", response_model=UserProfile)
-async def update_profile(request: UpdateProfileRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_profile(request: UpdateProfileRequest, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     # Validate image if provided
+    variants = []
     if request.image:
         try:
-            # Validate base64 format first
-            if not request.image.startswith('data:image/'):
-                # If not data URL, assume it's pure base64
-                image_data = base64.b64decode(request.image, validate=True)
-            else:
-                # Extract base64 data from data URL
-                if ',' in request.image:
-                    image_data = base64.b64decode(request.image.split(',')[1], validate=True)
-                else:
-                    raise ValueError("Invalid data URL format")
-            
-            # Check file size first (before PIL processing)
-            if len(image_data) > 1024 * 1024:  # 1MB
-                raise HTTPException(status_code=400, detail="Image must be less than 1MB")
-            
-            if PIL_AVAILABLE:
-                # Validate image with PIL
-                image = Image.open(io.BytesIO(image_data))
-                
-                # Validate image format
-                if image.format not in ['JPEG', 'PNG']:
-                    raise HTTPException(status_code=400, detail="Image must be JPEG or PNG format")
-                
-                # Validate image dimensions
-                width, height = image.size
-                if width != height:
-                    raise HTTPException(status_code=400, detail="Image must be square")
-                
-                if width < 500 or width > 1000:
-                    raise HTTPException(status_code=400, detail="Image must be between 500x500 and 1000x1000 pixels")
-                
-                # Verify image can be processed
-                image.verify()
-            else:
-                # Basic validation without PIL
-                if len(image_data) < 100:  # Too small to be a valid image
-                    raise HTTPException(status_code=400, detail="Invalid image data")
-                
+            # Accepts a data URL or pure base64
+            image_data = decode_image_data(request.image)
         except binascii.Error:
             raise HTTPException(status_code=400, detail="Invalid base64 image data")
         except ValueError as e:
             raise HTTPException(status_code=400, detail=f"Invalid image: {str(e)}")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail="Invalid image format")
+        
+        # Check file size first (before PIL processing)
+        if len(image_data) > 1024 * 1024:  # 1MB
+            raise HTTPException(status_code=400, detail="Image must be less than 1MB")
+        
+        # Same worker-pool validation and variant rendering as the multipart upload
+        variants = await check_profile_image(image_data)
     
     try:
         # Sanitize and validate user inputs
         safe_name = validate_user_input(request.name, 100)
         safe_bio = validate_user_input(request.bio, 1000)
         
-        # Update user profile
-        current_user.name = safe_name
-        current_user.bio = safe_bio
+        async with write_transaction(db):
+            # Update user profile
+            current_user.name = safe_name
+            current_user.bio = safe_bio
+            
+            if request.image:
+                current_user.profile_image_hash = await store_profile_image(db, image_data)
+                current_user.profile_image = None
+                await store_image_variants(db, current_user.profile_image_hash, variants)
+            
+            # Handle skills for mentors
+            if current_user.role == "mentor" and request.skills:
+                # Sanitize each skill
+                safe_skills = [validate_user_input(skill, 50) for skill in request.skills if skill.strip()]
+                current_user.skills = json.dumps(safe_skills)
+                await replace_mentor_skills(db, current_user.id, safe_skills)
+            
+            if current_user.role == "mentor":
+                version = await bump_directory_version(db)
+                after_commit(db, lambda: mentor_index.mentor_changed(
+                    version, current_user.id, current_user.email, current_user.name, current_user.bio,
+                    current_user.profile_image_hash, load_skills(current_user.skills)))
         
+        user_cache.pop(current_user.id)
         if request.image:
-            current_user.profile_image = request.image
-        
-        # Handle skills for mentors
-        if current_user.role == "mentor" and request.skills:
-            # Sanitize each skill
-            safe_skills = [validate_user_input(skill, 50) for skill in request.skills if skill.strip()]
-            current_user.skills = json.dumps(safe_skills)
-        
-        db.commit()
+            image_cache.set_owner(current_user.id, current_user.profile_image_hash)
+        if current_user.role == "mentor":
+            mentor_directory_cache.invalidate()
         
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to update profile")
     
     # Return updated profile
@@ -442,7 +2511,7 @@ async def update_profile(request: UpdateProfileRequest, db: Session = Depends(ge
     profile = ProfileDetails(
         name=current_user.name,
         bio=current_user.bio,
-        imageUrl=f"/api/images/{current_user.role}/{current_user.id}",
+        imageUrl=profile_image_url(current_user.role, current_user.id, current_user.profile_image_hash),
         skills=skills
     )
     
@@ -453,53 +2522,304 @@ async def update_profile(request: UpdateProfileRequest, db: Session = Depends(ge
         profile=profile
     )
 
+# The body is parsed by hand so it can be cut off early, so document it explicitly
+IMAGE_UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "required": ["image"],
+        "properties": {"image": {"type": "string", "format": "binary",
+                                 "description": "Square JPEG or PNG, 500-1000px, at most 1MB"}},
+    }}},
+}
+
+@api_router.put("/profile/image", response_model=UserProfile, openapi_extra={"requestBody": IMAGE_UPLOAD_REQUEST_BODY})
+async def upload_profile_image(request: Request, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data with an image file")
+
+    # Refuse a declared oversized body before reading any of it
+    body_limit = IMAGE_UPLOAD_MAX_BYTES + IMAGE_UPLOAD_OVERHEAD_BYTES
+    try:
+        declared_length = int(request.headers.get("content-length", "0"))
+    except ValueError:
+        declared_length = 0
+    if declared_length > body_limit:
+        raise HTTPException(status_code=413, detail="Image must be less than 1MB")
+
+    # Parse chunks as they arrive: only the image part is kept, and a wrong signature
+    # or too many bytes stops the upload without reading the rest of the body
+    upload = ImageUploadParser(boundary, IMAGE_UPLOAD_MAX_BYTES)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise HTTPException(status_code=413, detail="Image must be less than 1MB")
+            upload.write(chunk)
+        image_data = upload.finish()
+    except ValueError:
+        # python-multipart parse errors
+        raise HTTPException(status_code=400, detail="Malformed multipart body")
+
+    variants = await check_profile_image(image_data)
+
+    try:
+        async with write_transaction(db):
+            current_user.profile_image_hash = await store_profile_image(db, image_data)
+            current_user.profile_image = None
+            await store_image_variants(db, current_user.profile_image_hash, variants)
+            if current_user.role == "mentor":
+                # Mentor lists carry the image hash in imageUrl
+                version = await bump_directory_version(db)
+                after_commit(db, lambda: mentor_index.mentor_changed(
+                    version, current_user.id, current_user.email, current_user.name, current_user.bio,
+                    current_user.profile_image_hash, load_skills(current_user.skills)))
+
+        user_cache.pop(current_user.id)
+        image_cache.set_owner(current_user.id, current_user.profile_image_hash)
+        if current_user.role == "mentor":
+            mentor_directory_cache.invalidate()
+    except SQLAlchemyError:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred")
+
+    skills = None
+    if current_user.role == "mentor" and current_user.skills:
+        try:
+            skills = json.loads(current_user.skills)
+        except (json.JSONDecodeError, TypeError):
+            skills = []
+
+    profile = ProfileDetails(
+        name=current_user.name or "",
+        bio=current_user.bio or "",
+        imageUrl=profile_image_url(current_user.role, current_user.id, current_user.profile_image_hash),
+        skills=skills
+    )
+
+    return UserProfile(
+        id=current_user.id,
+        email=current_user.email,
+        role=current_user.role,
+        profile=profile
+    )
+
 @api_router.get("/images/{role}/{user_id}")
-async def get_profile_image(role: str, user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+async def get_profile_image(
+    role: str,
+    user_id: int,
+    request: Request,
+    v: Optional[str] = None,
+    size: Optional[int] = Query(None, gt=0),
+    image_format: Optional[str] = Query(None, alias="format", pattern="^(webp|jpeg)$"),
+    db: AsyncSession = Depends(get_db), current_user: TokenUser = Depends(get_token_user)):
+    image_hash = image_cache.get_owner(user_id)
+    legacy = None
+    if image_hash is None:
+        row = (await db.execute(select(User.profile_image_hash).where(User.id == user_id))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        image_hash = row[0]
+        if not image_hash:
+            # Rows not yet moved by migrate_images.py still hold base64. They have no
+            # profile_images row to fall back on, so serve the decoded bytes directly and
+            # don't remember the owner, or a later cache miss would find nothing.
+            legacy_image = await db.scalar(select(User.profile_image).where(User.id == user_id))
+            if legacy_image:
+                try:
+                    image_data = decode_image_data(legacy_image)
+                    image_hash = hashlib.sha256(image_data).hexdigest()
+                    legacy = (image_data, detect_image_content_type(image_data))
+                except (binascii.Error, ValueError):
+                    image_hash = None
+        if legacy is None:
+            image_cache.set_owner(user_id, image_hash)
     
-    if user.profile_image:
-        try:
-            # Handle both data URL and plain base64
-            if user.profile_image.startswith('data:image/'):
-                if ',' in user.profile_image:
-                    image_data = base64.b64decode(user.profile_image.split(',')[1])
-                else:
-                    raise ValueError("Invalid data URL format")
-            else:
-                image_data = base64.b64decode(user.profile_image)
-            return Response(content=image_data, media_type="image/jpeg")
-        except (binascii.Error, ValueError):
-            pass
+    serve_hash = image_hash
+    if image_hash and (size or image_format):
+        # Serve the pre-sized variant; images uploaded before variants existed fall back to the original
+        key = (image_hash, pick_variant_size(size), image_format or "jpeg")
+        variant_hash = image_cache.get_variant(key)
+        if variant_hash is None:
+            variant_hash = await db.scalar(select(ProfileImageVariant.variant_hash).where(
+                ProfileImageVariant.image_hash == key[0],
+                ProfileImageVariant.size == key[1],
+                ProfileImageVariant.format == key[2]
+            ))
+            image_cache.set_variant(key, variant_hash)
+        if variant_hash:
+            serve_hash = variant_hash
+    
+    if serve_hash:
+        etag = f'"{serve_hash}"'
+        if v and len(v) >= IMAGE_VERSION_MIN_LENGTH and image_hash.startswith(v):
+            cache_control = f"private, max-age={IMAGE_IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            # The unversioned URL changes content on upload; revalidate with the ETag
+            cache_control = "private, no-cache"
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
+        cached = legacy or image_cache.get(serve_hash)
+        if cached is None:
+            image = await db.scalar(select(ProfileImage).where(ProfileImage.hash == serve_hash))
+            if image:
+                cached = image_cache.put(serve_hash, image.data, image.content_type)
+        if cached:
+            image_data, content_type = cached
+            return Response(content=image_data, media_type=content_type, headers=headers)
     
     # Return default placeholder image based on role
     default_url = f"https://placehold.co/500x500.jpg?text={role.upper()}"
     return RedirectResponse(url=default_url)
 
-@api_router.get("/mentors", response_model=List[UserProfile])
-async def get_mentors(skill: Optional[str] = None, orderBy: Optional[str] = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    if current_user.role != "mentee":
-        raise HTTPException(status_code=403, detail="Only mentees can view mentor list")
+async def build_mentors_page(
+    db: AsyncSession,
+    request: Request,
+    skill: Optional[str],
+    orderBy: Optional[str],
+    skillMatch: str,
+    q: Optional[str],
+    limit: Optional[int],
+    cursor: Optional[str],
+    fields: Optional[str]
+):
+    """Query one /api/mentors response; returns (items, headers)"""
+    # Field projection, e.g. fields=name,skills for list views that skip bio
+    wanted_fields = set(MENTOR_FIELDS)
+    if fields:
+        wanted_fields = {field.strip() for field in fields.split(",") if field.strip()}
+        if not wanted_fields <= set(MENTOR_FIELDS):
+            raise HTTPException(status_code=400, detail=f"fields must be among: {', '.join(MENTOR_FIELDS)}")
     
-    query = db.query(User).filter(User.role == "mentor")
+    # Select only the columns the response needs, never the whole row
+    columns = [User.id, User.role]
+    if "email" in wanted_fields:
+        columns.append(User.email)
+    if "name" in wanted_fields or orderBy == "name":
+        columns.append(User.name)
+    if "bio" in wanted_fields:
+        columns.append(User.bio)
+    if "imageUrl" in wanted_fields:
+        columns.append(User.profile_image_hash)
+    if "skills" in wanted_fields:
+        columns.append(User.skills)
+    query = select(*columns).where(User.role == "mentor")
     
-    # Filter by skill if provided
+    # Filter by skill if provided; a comma-separated list matches all (or any) of them
     if skill:
-        query = query.filter(User.skills.like(f'%"{skill}"%'))
+        wanted = list(dict.fromkeys(
+            normalize_skill(sanitize_input(part)) for part in skill.split(",") if part.strip()
+        ))
+        matching = select(MentorSkill.user_id).where(MentorSkill.skill_normalized.in_(wanted))
+        if skillMatch == "all" and len(wanted) > 1:
+            matching = matching.group_by(MentorSkill.user_id).having(func.count() == len(wanted))
+        query = query.where(User.id.in_(matching))
     
-    # Order by name or skill
-    if orderBy == "name":
-        query = query.order_by(User.name)
-    elif orderBy == "skill":
-        query = query.order_by(User.skills)
+    # Free-text search over name, bio and skills, ranked by BM25 unless orderBy is given
+    rank = None
+    search = build_search_query(q) if q else None
+    if search and MENTOR_SEARCH_FTS:
+        matches = select(
+            mentor_search.c.rowid.label("user_id"),
+            func.bm25(literal_column("mentor_search"), *MENTOR_SEARCH_WEIGHTS).label("rank")
+        ).where(literal_column("mentor_search").op("MATCH")(search)).subquery()
+        query = query.join(matches, matches.c.user_id == User.id)
+        rank = matches.c.rank
+    elif search:
+        for term in re.findall(r"\w+", q)[:10]:
+            pattern = f"%{term}%"
+            query = query.where(or_(User.name.ilike(pattern), User.bio.ilike(pattern), User.skills.ilike(pattern)))
+    
+    if orderBy in ("name", "skill"):
+        order = orderBy
     else:
-        query = query.order_by(User.id)
+        order = "rank" if rank is not None else "id"
     
-    mentors = query.all()
+    # Keyset pagination: only when asked for, so the documented unpaged list keeps working
+    page_size = min(limit or MENTORS_PAGE_MAX, MENTORS_PAGE_MAX) if (limit or cursor) else None
+    fetch_limit = page_size + 1 if page_size else None
+    after = decode_cursor(cursor, order) if cursor else None
+    
+    if order == "skill":
+        # Sort by each mentor's first listed skill, walking ix_mentor_skills_position_skill
+        # in order, then append mentors without skills (cursor key [null, id])
+        first_skill = and_(MentorSkill.user_id == User.id, MentorSkill.position == 0)
+        rows = []
+        if not after or after[0] is not None:
+            with_skills = query.join(MentorSkill, first_skill).add_columns(MentorSkill.skill_normalized.label("sort_key"))
+            if after:
+                with_skills = with_skills.where(tuple_(MentorSkill.skill_normalized, MentorSkill.user_id) > tuple_(after[0], after[1]))
+            with_skills = with_skills.order_by(MentorSkill.skill_normalized, MentorSkill.user_id).limit(fetch_limit)
+            rows = (await db.execute(with_skills)).all()
+        if fetch_limit is None or len(rows) < fetch_limit:
+            without_skills = query.where(~select(MentorSkill.user_id).where(first_skill).exists()).add_columns(literal(None).label("sort_key"))
+            if after and after[0] is None:
+                without_skills = without_skills.where(User.id > after[1])
+            without_skills = without_skills.order_by(User.id).limit(fetch_limit - len(rows) if fetch_limit else None)
+            rows += (await db.execute(without_skills)).all()
+    else:
+        if order == "rank":
+            sort_columns = [rank, User.id]
+        elif order == "name":
+            sort_columns = [User.name, User.id]
+        else:
+            sort_columns = [User.id]
+        if len(sort_columns) > 1:
+            query = query.add_columns(sort_columns[0].label("sort_key"))
+        if after:
+            if len(sort_columns) > 1:
+                query = query.where(tuple_(*sort_columns) > tuple_(*after))
+            else:
+                query = query.where(User.id > after[0])
+        rows = (await db.execute(query.order_by(*sort_columns).limit(fetch_limit))).all()
+    
+    headers = {}
+    if page_size and len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(order, [last.id] if order == "id" else [last.sort_key, last.id])
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.path}?{request.url.include_query_params(cursor=next_cursor).query}>; rel="next"'
+    
+    if fields:
+        # Projected items don't fit UserProfile, so bypass the response model
+        result = []
+        for mentor in rows:
+            profile = {}
+            if "name" in wanted_fields:
+                profile["name"] = mentor.name or ""
+            if "bio" in wanted_fields:
+                profile["bio"] = mentor.bio or ""
+            if "imageUrl" in wanted_fields:
+                profile["imageUrl"] = profile_image_url(mentor.role, mentor.id, mentor.profile_image_hash)
+            if "skills" in wanted_fields:
+                profile["skills"] = load_skills(mentor.skills)
+            item = {"id": mentor.id, "role": mentor.role, "profile": profile}
+            if "email" in wanted_fields:
+                item["email"] = mentor.email
+            result.append(item)
+        return result, headers
+    
+    if FAST_JSON:
+        # Same shape as UserProfile, without building and dumping two models per row
+        return [
+            {"id": mentor.id, "email": mentor.email, "role": mentor.role, "profile": {
+                "name": mentor.name or "",
+                "bio": mentor.bio or "",
+                "imageUrl": profile_image_url(mentor.role, mentor.id, mentor.profile_image_hash),
+                "skills": load_skills(mentor.skills),
+            }}
+            for mentor in rows
+        ], headers
     
     result = []
-    for mentor in mentors:
+    for mentor in rows:
         skills = []
         if mentor.skills:
             try:
@@ -510,7 +2830,7 @@ async def get_mentors(skill: Optional[str] = None, orderBy: Optional[str] = None
         profile = ProfileDetails(
             name=mentor.name or "",
             bio=mentor.bio or "",
-            imageUrl=f"/api/images/{mentor.role}/{mentor.id}",
+            imageUrl=profile_image_url(mentor.role, mentor.id, mentor.profile_image_hash),
             skills=skills
         )
         
@@ -521,249 +2841,595 @@ async def get_mentors(skill: Optional[str] = None, orderBy: Optional[str] = None
             profile=profile
         ))
     
-    return result
+    return [item.model_dump() for item in result], headers
+
+@api_router.get("/mentors", response_model=List[UserProfile])
+async def get_mentors(
+    request: Request,
+    skill: Optional[str] = None,
+    orderBy: Optional[str] = None,
+    skillMatch: str = Query("all", pattern="^(all|any)$"),
+    q: Optional[str] = Query(None, max_length=200),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenUser = Depends(get_token_user)
+):
+    if current_user.role != "mentee":
+        raise HTTPException(status_code=403, detail="Only mentees can view mentor list")
+    
+    # The list is the same for every mentee, so it is cached per directory version
+    key = (skill, orderBy, skillMatch, q, limit, cursor, fields)
+    version, updated_at = await mentor_directory_cache.current_version(db)
+    etag = f'"mentors-{version}-{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}"'
+    validators = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=validators)
+    
+    entry = mentor_directory_cache.get(key)
+    if entry is None:
+        started_at = time.perf_counter()
+        items, headers = await build_mentors_page(db, request, skill, orderBy, skillMatch, q, limit, cursor, fields)
+        body = dump_json(items) if FAST_JSON else json.dumps(items, ensure_ascii=False).encode()
+        entry = mentor_directory_cache.put(key, body, headers, time.perf_counter() - started_at)
+    body, headers = entry
+    return Response(content=body, media_type="application/json", headers={**headers, **validators})
+
+@api_router.get("/mentors/recommend", response_model=List[MentorRecommendation])
+async def recommend_mentors(
+    skills: str = Query(..., max_length=1000),
+    limit: int = Query(RECOMMEND_DEFAULT_LIMIT, ge=1, le=RECOMMEND_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenUser = Depends(get_token_user)
+):
+    """Mentors sharing the most of the given skills, leaving out mentors who already
+    have an accepted mentee. Ties go to the most recently joined mentor."""
+    if current_user.role != "mentee":
+        raise HTTPException(status_code=403, detail="Only mentees can view mentor list")
+    
+    keys = list(dict.fromkeys(normalize_skill(skill) for skill in skills.split(",") if skill.strip()))
+    if not keys:
+        raise HTTPException(status_code=400, detail="skills must name at least one skill")
+    if len(keys) > RECOMMEND_MAX_SKILLS:
+        raise HTTPException(status_code=400, detail=f"At most {RECOMMEND_MAX_SKILLS} skills can be given")
+    
+    await mentor_index.ensure_current(db)
+    wanted = set(keys)
+    return [
+        MentorRecommendation(
+            id=record.id,
+            email=record.email,
+            role="mentor",
+            profile=ProfileDetails(
+                name=record.name,
+                bio=record.bio,
+                imageUrl=profile_image_url("mentor", record.id, record.image_hash),
+                skills=list(record.skills)
+            ),
+            matchedSkills=[skill for skill in record.skills if normalize_skill(skill) in wanted]
+        )
+        for record, _ in mentor_index.recommend(keys, limit)
+    ]
+
+@api_router.get("/users", response_model=List[UserProfile])
+async def get_users(
+    ids: str = Query(..., max_length=2000),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenUser = Depends(get_token_user)
+):
+    """Many profiles in one IN query, in the order asked for.
+
+    Mentees can look up mentors, mentors the mentees who have sent them a request, and
+    everyone themselves; other ids are left out rather than failing the whole batch.
+    """
+    try:
+        wanted = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(wanted) > USERS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {USERS_BATCH_MAX} ids per request")
+    if not wanted:
+        return []
+    
+    if current_user.role == "mentee":
+        visible = or_(User.role == "mentor", User.id == current_user.id)
+    else:
+        visible = or_(
+            User.id == current_user.id,
+            exists().where(MatchRequest.mentor_id == current_user.id, MatchRequest.mentee_id == User.id),
+            exists().where(MatchRequestArchive.mentor_id == current_user.id, MatchRequestArchive.mentee_id == User.id),
+        )
+    rows = (await db.execute(
+        select(User.id, User.email, User.role, User.name, User.bio, User.profile_image_hash, User.skills)
+        .where(User.id.in_(wanted), visible)
+    )).all()
+    
+    by_id = {row.id: row for row in rows}
+    return [
+        UserProfile(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            profile=ProfileDetails(
+                name=user.name or "",
+                bio=user.bio or "",
+                imageUrl=profile_image_url(user.role, user.id, user.profile_image_hash),
+                skills=load_skills(user.skills) if user.role == "mentor" else None
+            )
+        )
+        for user in (by_id.get(user_id) for user_id in wanted) if user is not None
+    ]
+
+async def match_request_conflict(db: AsyncSession, mentor_id: int, mentee_id: int) -> HTTPException:
+    """Explain why a match request was refused; only runs on the failure path"""
+    mentor = await db.scalar(select(User.id).where(User.id == mentor_id, User.role == "mentor"))
+    if not mentor:
+        return HTTPException(status_code=400, detail="Mentor not found")
+    
+    if mentor_id == mentee_id:
+        return HTTPException(status_code=400, detail="Cannot send request to yourself")
+    
+    existing_status = await db.scalar(select(MatchRequest.status).where(
+        MatchRequest.mentee_id == mentee_id,
+        MatchRequest.mentor_id == mentor_id,
+        MatchRequest.status.in_(["pending", "accepted"])
+    ))
+    if existing_status == "accepted":
+        return HTTPException(status_code=400, detail="You already have an accepted request with this mentor")
+    if existing_status == "pending":
+        return HTTPException(status_code=400, detail="You already have a pending request to this mentor")
+    
+    return HTTPException(status_code=400, detail="You already have a pending request. Cancel it first to send a new one") \
+        if await db.scalar(select(MatchRequest.id).where(MatchRequest.mentee_id == mentee_id, MatchRequest.status == "pending")) \
+        else HTTPException(status_code=400, detail="This mentor already has an accepted mentee")
+
+def match_request_columns(source):
+    return (source.id, source.mentor_id, source.mentee_id, source.message, source.status, source.updated_at)
+
+MATCH_REQUEST_COLUMNS = match_request_columns(MatchRequest)
+
+def match_request_response(row) -> MatchRequestResponse:
+    return MatchRequestResponse(
+        id=row.id,
+        mentorId=row.mentor_id,
+        menteeId=row.mentee_id,
+        message=row.message,
+        status=row.status,
+        updatedAt=row.updated_at
+    )
+
+def embedded_profile(row) -> Optional[dict]:
+    """ProfileDetails fields from the profile_* columns list_match_requests joins in"""
+    if row.profile_id is None:
+        return None
+    return {
+        "name": row.profile_name or "",
+        "bio": row.profile_bio or "",
+        "imageUrl": profile_image_url(row.profile_role, row.profile_id, row.profile_image_hash),
+        "skills": load_skills(row.profile_skills) if row.profile_role == "mentor" else None,
+    }
+
+def match_request_list_body(rows, with_message: bool = True, embed: bool = False) -> bytes:
+    """FAST_JSON body for the incoming (with message) and outgoing lists"""
+    if with_message:
+        items = [
+            {"id": row.id, "mentorId": row.mentor_id, "menteeId": row.mentee_id, "message": row.message,
+             "status": row.status, "updatedAt": row.updated_at}
+            for row in rows
+        ]
+    else:
+        items = [
+            {"id": row.id, "mentorId": row.mentor_id, "menteeId": row.mentee_id,
+             "status": row.status, "updatedAt": row.updated_at}
+            for row in rows
+        ]
+    if embed:
+        key = "menteeProfile" if with_message else "mentorProfile"
+        for item, row in zip(items, rows):
+            item[key] = embedded_profile(row)
+    return dump_json(items)
+
+async def list_match_requests(
+    db: AsyncSession,
+    request: Request,
+    owner: str,
+    user_id: int,
+    status: Optional[str],
+    since: Optional[datetime],
+    limit: Optional[int],
+    cursor: Optional[str],
+    archived: bool = False,
+    embed: bool = False
+):
+    """Rows for the incoming/outgoing lists, from the archive if asked; returns (rows, headers).
+
+    With embed, each row also carries the other side's profile columns (profile_*), joined
+    in the same query.
+    """
+    source = MatchRequestArchive if archived else MatchRequest
+    query = select(*match_request_columns(source)).where(getattr(source, owner) == user_id)
+    if embed:
+        counterpart = aliased(User)
+        other_id = source.mentee_id if owner == "mentor_id" else source.mentor_id
+        query = query.outerjoin(counterpart, counterpart.id == other_id).add_columns(
+            counterpart.id.label("profile_id"),
+            counterpart.role.label("profile_role"),
+            counterpart.name.label("profile_name"),
+            counterpart.bio.label("profile_bio"),
+            counterpart.profile_image_hash.label("profile_image_hash"),
+            counterpart.skills.label("profile_skills"),
+        )
+    
+    if status:
+        statuses = [part.strip() for part in status.split(",") if part.strip()]
+        if not set(statuses) <= set(MATCH_REQUEST_STATUSES):
+            raise HTTPException(status_code=400, detail=f"status must be among: {', '.join(MATCH_REQUEST_STATUSES)}")
+        query = query.where(source.status.in_(statuses))
+    
+    # Incremental sync: only rows changed after `since`, oldest change first, so the
+    # last row's updatedAt is the next `since` once the pages run out
+    order = "updated" if since else "id"
+    if since:
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        query = query.where(source.updated_at > since)
+    
+    # Keyset pagination: only when asked for, so the documented unpaged list keeps working
+    page_size = min(limit or MATCH_REQUESTS_PAGE_MAX, MATCH_REQUESTS_PAGE_MAX) if (limit or cursor) else None
+    if cursor:
+        after = decode_cursor(cursor, order)
+        try:
+            if order == "updated":
+                query = query.where(tuple_(source.updated_at, source.id) > tuple_(
+                    literal(datetime.fromisoformat(after[0])), int(after[1])
+                ))
+            else:
+                query = query.where(source.id > int(after[0]))
+        except (IndexError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    sort_columns = [source.updated_at, source.id] if order == "updated" else [source.id]
+    rows = (await db.execute(query.order_by(*sort_columns).limit(page_size + 1 if page_size else None))).all()
+    
+    headers = {}
+    if page_size and len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(order, [last.updated_at.isoformat(), last.id] if order == "updated" else [last.id])
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.path}?{request.url.include_query_params(cursor=next_cursor).query}>; rel="next"'
+    return rows, headers
 
 @api_router.post("/match-requests", response_model=MatchRequestResponse)
-async def create_match_request(request: MatchRequestCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_match_request(request: MatchRequestCreate, db: AsyncSession = Depends(get_db), current_user: TokenUser = Depends(get_token_user)):
     try:
         if current_user.role != "mentee":
             raise HTTPException(status_code=403, detail="Only mentees can send match requests")
         
-        # Validate mentor exists and is actually a mentor
-        mentor = db.query(User).filter(User.id == request.mentorId, User.role == "mentor").first()
-        if not mentor:
-            raise HTTPException(status_code=400, detail="Mentor not found")
-        
-        # Prevent self-matching
-        if request.mentorId == current_user.id:
-            raise HTTPException(status_code=400, detail="Cannot send request to yourself")
-        
-        # Check if mentee already has a pending request to this mentor
-        existing_request = db.query(MatchRequest).filter(
-            MatchRequest.mentee_id == current_user.id,
-            MatchRequest.mentor_id == request.mentorId,
-            MatchRequest.status.in_(["pending", "accepted"])
-        ).first()
-        if existing_request:
-            if existing_request.status == "accepted":
-                raise HTTPException(status_code=400, detail="You already have an accepted request with this mentor")
-            else:
-                raise HTTPException(status_code=400, detail="You already have a pending request to this mentor")
-        
-        # Check if mentee already has a pending request to any mentor
-        any_pending_request = db.query(MatchRequest).filter(
-            MatchRequest.mentee_id == current_user.id,
-            MatchRequest.status == "pending"
-        ).first()
-        if any_pending_request:
-            raise HTTPException(status_code=400, detail="You already have a pending request. Cancel it first to send a new one")
-        
-        # Check if mentor already has an accepted mentee
-        mentor_accepted_request = db.query(MatchRequest).filter(
-            MatchRequest.mentor_id == request.mentorId,
-            MatchRequest.status == "accepted"
-        ).first()
-        if mentor_accepted_request:
-            raise HTTPException(status_code=400, detail="This mentor already has an accepted mentee")
-        
         # Sanitize message
         safe_message = validate_user_input(request.message, 500)
         
-        # Create new match request
-        new_request = MatchRequest(
-            mentor_id=request.mentorId,
-            mentee_id=current_user.id,
-            message=safe_message,
-            status="pending"
-        )
-        
-        db.add(new_request)
-        db.commit()
-        db.refresh(new_request)
+        # One INSERT ... SELECT whose WHERE carries every precondition; the partial
+        # unique indexes catch a writer in another process that slips in between
+        try:
+            async with write_transaction(db):
+                new_id = None
+                now = datetime.utcnow()
+                if request.mentorId != current_user.id:
+                    other = aliased(MatchRequest)
+                    new_id = await db.scalar(
+                        insert(MatchRequest).from_select(
+                            ["mentor_id", "mentee_id", "message", "status", "created_at", "updated_at"],
+                            select(
+                                literal(request.mentorId), literal(current_user.id), literal(safe_message),
+                                literal("pending"), literal(now), literal(now)
+                            ).where(
+                                exists().where(User.id == request.mentorId, User.role == "mentor"),
+                                ~exists().where(other.mentee_id == current_user.id, other.status == "pending"),
+                                ~exists().where(other.mentor_id == request.mentorId, other.status == "accepted"),
+                            )
+                        ).returning(MatchRequest.id)
+                    )
+                if new_id is None:
+                    raise await match_request_conflict(db, request.mentorId, current_user.id)
+                await match_events.publish(db, {
+                    "id": new_id,
+                    "mentorId": request.mentorId,
+                    "menteeId": current_user.id,
+                    "message": safe_message,
+                    "status": "pending",
+                    "updatedAt": now.isoformat()
+                })
+        except IntegrityError:
+            raise await match_request_conflict(db, request.mentorId, current_user.id)
         
         return MatchRequestResponse(
-            id=new_request.id,
-            mentorId=new_request.mentor_id,
-            menteeId=new_request.mentee_id,
-            message=new_request.message,
-            status=new_request.status
+            id=new_id,
+            mentorId=request.mentorId,
+            menteeId=current_user.id,
+            message=safe_message,
+            status="pending",
+            updatedAt=now
         )
         
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except HTTPException:
         raise
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to create match request")
 
-@api_router.get("/match-requests/incoming", response_model=List[MatchRequestResponse])
-async def get_incoming_requests(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@api_router.get("/match-requests/stream")
+async def stream_match_requests(request: Request, current_user: TokenUser = Depends(get_stream_user)):
+    """Server-Sent Events: a `match-request` event (MatchRequestResponse) whenever a request
+    involving the user is created, accepted, rejected or cancelled. Reconnects resume from
+    Last-Event-ID; `resync` means events were missed and the lists should be re-fetched."""
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("lastEventId")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    await match_events.start()
+    queue = match_events.subscribe(current_user.id)
+    
+    async def events():
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            last_sent = 0
+            if last_event_id is not None:
+                backlog = await match_events.history(current_user.id, last_event_id)
+                if backlog is None:
+                    yield "event: resync\ndata: {}\n\n"
+                else:
+                    last_sent = last_event_id
+                    for event_id, event in backlog:
+                        yield format_sse(event_id, "match-request", event)
+                        last_sent = event_id
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if item is None:
+                    break
+                event_id, event = item
+                if event_id > last_sent:
+                    last_sent = event_id
+                    yield format_sse(event_id, "match-request", event)
+        finally:
+            match_events.unsubscribe(current_user.id, queue)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+@api_router.get("/match-requests/incoming", response_model=List[MatchRequestIncoming], response_model_exclude_unset=True)
+async def get_incoming_requests(
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    archived: bool = False,
+    embed: Optional[str] = Query(None, pattern="^profile$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenUser = Depends(get_token_user)
+):
     if current_user.role != "mentor":
         raise HTTPException(status_code=403, detail="Only mentors can view incoming requests")
     
-    requests = db.query(MatchRequest).filter(MatchRequest.mentor_id == current_user.id).all()
+    requests, headers = await list_match_requests(
+        db, request, "mentor_id", current_user.id, status, since, limit, cursor, archived, embed=bool(embed)
+    )
+    if FAST_JSON:
+        return Response(content=match_request_list_body(requests, embed=bool(embed)), media_type="application/json", headers=headers)
+    response.headers.update(headers)
     
-    return [
-        MatchRequestResponse(
-            id=req.id,
-            mentorId=req.mentor_id,
-            menteeId=req.mentee_id,
-            message=req.message,
-            status=req.status
-        )
-        for req in requests
-    ]
+    if embed:
+        return [
+            MatchRequestIncoming(
+                id=req.id,
+                mentorId=req.mentor_id,
+                menteeId=req.mentee_id,
+                message=req.message,
+                status=req.status,
+                updatedAt=req.updated_at,
+                menteeProfile=embedded_profile(req)
+            )
+            for req in requests
+        ]
+    return [match_request_response(req) for req in requests]
 
-@api_router.get("/match-requests/outgoing", response_model=List[MatchRequestOutgoing])
-async def get_outgoing_requests(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@api_router.get("/match-requests/outgoing", response_model=List[MatchRequestOutgoing], response_model_exclude_unset=True)
+async def get_outgoing_requests(
+    request: Request,
+    response: Response,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = None,
+    archived: bool = False,
+    embed: Optional[str] = Query(None, pattern="^profile$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenUser = Depends(get_token_user)
+):
     if current_user.role != "mentee":
         raise HTTPException(status_code=403, detail="Only mentees can view outgoing requests")
     
-    requests = db.query(MatchRequest).filter(MatchRequest.mentee_id == current_user.id).all()
+    requests, headers = await list_match_requests(
+        db, request, "mentee_id", current_user.id, status, since, limit, cursor, archived, embed=bool(embed)
+    )
+    if FAST_JSON:
+        return Response(content=match_request_list_body(requests, with_message=False, embed=bool(embed)),
+                        media_type="application/json", headers=headers)
+    response.headers.update(headers)
     
     return [
         MatchRequestOutgoing(
             id=req.id,
             mentorId=req.mentor_id,
             menteeId=req.mentee_id,
-            status=req.status
+            status=req.status,
+            updatedAt=req.updated_at,
+            **({"mentorProfile": embedded_profile(req)} if embed else {})
         )
         for req in requests
     ]
 
+async def accept_conflict(db: AsyncSession, request_id: int, mentor_id: int) -> HTTPException:
+    pending = await db.scalar(select(MatchRequest.id).where(
+        MatchRequest.id == request_id,
+        MatchRequest.mentor_id == mentor_id,
+        MatchRequest.status == "pending"
+    ))
+    if not pending:
+        return HTTPException(status_code=404, detail="Match request not found or already processed")
+    return HTTPException(status_code=400, detail="You already have an accepted mentee")
+
 @api_router.put("/match-requests/{request_id}/accept", response_model=MatchRequestResponse)
-async def accept_match_request(request_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def accept_match_request(request_id: int, db: AsyncSession = Depends(get_db), current_user: TokenUser = Depends(get_token_user)):
     if current_user.role != "mentor":
         raise HTTPException(status_code=403, detail="Only mentors can accept requests")
     
     try:
-        request = db.query(MatchRequest).filter(
-            MatchRequest.id == request_id,
-            MatchRequest.mentor_id == current_user.id,
-            MatchRequest.status == "pending"
-        ).first()
-        
-        if not request:
-            raise HTTPException(status_code=404, detail="Match request not found or already processed")
-        
-        # Check if mentor already has an accepted request
-        existing_accepted = db.query(MatchRequest).filter(
-            MatchRequest.mentor_id == current_user.id,
-            MatchRequest.status == "accepted"
-        ).first()
-        
-        if existing_accepted:
-            raise HTTPException(status_code=400, detail="You already have an accepted mentee")
-        
-        # Accept this request and reject all other pending requests for this mentor
-        request.status = "accepted"
-        
-        # Reject other pending requests for this mentor
-        other_requests = db.query(MatchRequest).filter(
-            MatchRequest.mentor_id == current_user.id,
-            MatchRequest.id != request_id,
-            MatchRequest.status == "pending"
-        ).all()
-        
-        for other_req in other_requests:
-            other_req.status = "rejected"
+        async with write_transaction(db):
+            # Accept this request and reject the mentor's other pending requests in one
+            # statement, guarded so it only fires while the mentor has no accepted mentee
+            other = aliased(MatchRequest)
+            rows = (await db.execute(
+                update(MatchRequest)
+                .where(
+                    MatchRequest.mentor_id == current_user.id,
+                    MatchRequest.status == "pending",
+                    exists().where(other.id == request_id, other.mentor_id == current_user.id, other.status == "pending"),
+                    ~exists().where(other.mentor_id == current_user.id, other.status == "accepted"),
+                )
+                .values(
+                    status=case((MatchRequest.id == request_id, "accepted"), else_="rejected"),
+                    updated_at=datetime.utcnow()
+                )
+                .returning(*MATCH_REQUEST_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )).all()
+            request = next((row for row in rows if row.id == request_id), None)
+            if request is None:
+                raise await accept_conflict(db, request_id, current_user.id)
+            version = await bump_directory_version(db, "mentor_availability")
+            after_commit(db, lambda: mentor_index.availability_changed(version, current_user.id, False))
+            for row in rows:
+                await match_events.publish(db, match_request_response(row).model_dump(mode="json"))
         
-        db.commit()
-        
-        return MatchRequestResponse(
-            id=request.id,
-            mentorId=request.mentor_id,
-            menteeId=request.mentee_id,
-            message=request.message,
-            status=request.status
-        )
+        return match_request_response(request)
         
+    except IntegrityError:
+        raise await accept_conflict(db, request_id, current_user.id)
     except HTTPException:
         raise
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to accept match request")
 
 @api_router.put("/match-requests/{request_id}/reject", response_model=MatchRequestResponse)
-async def reject_match_request(request_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def reject_match_request(request_id: int, db: AsyncSession = Depends(get_db), current_user: TokenUser = Depends(get_token_user)):
     if current_user.role != "mentor":
         raise HTTPException(status_code=403, detail="Only mentors can reject requests")
     
     try:
-        request = db.query(MatchRequest).filter(
-            MatchRequest.id == request_id,
-            MatchRequest.mentor_id == current_user.id,
-            MatchRequest.status == "pending"
-        ).first()
-        
-        if not request:
-            raise HTTPException(status_code=404, detail="Match request not found or already processed")
+        async with write_transaction(db):
+            request = (await db.execute(
+                update(MatchRequest)
+                .where(
+                    MatchRequest.id == request_id,
+                    MatchRequest.mentor_id == current_user.id,
+                    MatchRequest.status == "pending"
+                )
+                .values(status="rejected", updated_at=datetime.utcnow())
+                .returning(*MATCH_REQUEST_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )).first()
+            
+            if not request:
+                raise HTTPException(status_code=404, detail="Match request not found or already processed")
+            await match_events.publish(db, match_request_response(request).model_dump(mode="json"))
         
-        request.status = "rejected"
-        db.commit()
-        
-        return MatchRequestResponse(
-            id=request.id,
-            mentorId=request.mentor_id,
-            menteeId=request.mentee_id,
-            message=request.message,
-            status=request.status
-        )
+        return match_request_response(request)
         
     except HTTPException:
         raise
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to reject match request")
 
 @api_router.delete("/match-requests/{request_id}", response_model=MatchRequestResponse)
-async def cancel_match_request(request_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def cancel_match_request(request_id: int, db: AsyncSession = Depends(get_db), current_user: TokenUser = Depends(get_token_user)):
     if current_user.role != "mentee":
         raise HTTPException(status_code=403, detail="Only mentees can cancel requests")
     
     try:
-        request = db.query(MatchRequest).filter(
-            MatchRequest.id == request_id,
-            MatchRequest.mentee_id == current_user.id
-        ).first()
-        
-        if not request:
-            raise HTTPException(status_code=404, detail="Match request not found")
-        
-        if request.status == "cancelled":
-            raise HTTPException(status_code=400, detail="Request already cancelled")
-        
-        request.status = "cancelled"
-        db.commit()
+        async with write_transaction(db):
+            was_accepted = await db.scalar(select(MatchRequest.id).where(
+                MatchRequest.id == request_id,
+                MatchRequest.mentee_id == current_user.id,
+                MatchRequest.status == "accepted"
+            )) is not None
+            request = (await db.execute(
+                update(MatchRequest)
+                .where(
+                    MatchRequest.id == request_id,
+                    MatchRequest.mentee_id == current_user.id,
+                    MatchRequest.status != "cancelled"
+                )
+                .values(status="cancelled", updated_at=datetime.utcnow())
+                .returning(*MATCH_REQUEST_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )).first()
+            
+            if not request:
+                owned = await db.scalar(select(MatchRequest.id).where(
+                    MatchRequest.id == request_id,
+                    MatchRequest.mentee_id == current_user.id
+                ))
+                if not owned:
+                    raise HTTPException(status_code=404, detail="Match request not found")
+                raise HTTPException(status_code=400, detail="Request already cancelled")
+            if was_accepted:
+                # The mentor is free to take a new mentee again
+                version = await bump_directory_version(db, "mentor_availability")
+                after_commit(db, lambda: mentor_index.availability_changed(version, request.mentor_id, True))
+            await match_events.publish(db, match_request_response(request).model_dump(mode="json"))
         
-        return MatchRequestResponse(
-            id=request.id,
-            mentorId=request.mentor_id,
-            menteeId=request.mentee_id,
-            message=request.message,
-            status=request.status
-        )
+        return match_request_response(request)
         
     except HTTPException:
         raise
     except SQLAlchemyError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Failed to cancel match request")
 
 # Include API router with /api prefix
-app.include_router(api_router, prefix="/api")
+app.include_router(api_router, prefix=API_PREFIX)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
+    # Single process for development; serve.py runs several workers in production
+    uvicorn.run(app, host=os.getenv("HOST", "0.0.0.0"), port=int(os.getenv("PORT", "8080")))
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+프로필 이미지 마이그레이션 도구
+
+users.profile_image 에 base64 로 저장된 기존 이미지를 profile_images 테이블
+(SHA-256 해시 키)로 옮기고, users 행에는 해시만 남깁니다.
+--variants 를 주면 리사이즈 변형(썸네일/WebP)이 없는 이미지에 대해 변형을 생성합니다.
+
+    python migrate_images.py [--batch-size 200] [--dry-run] [--vacuum] [--variants]
+"""
+
+import argparse
+import binascii
+import hashlib
+import sys
+
+from sqlalchemy import select
+
+from main import (
+    SessionLocal, prepare_database, User, ProfileImage, ProfileImageVariant,
+    decode_image_data, detect_image_content_type, render_image_variants
+)
+
+
+def store_blob(db, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    if db.get(ProfileImage, digest) is None:
+        db.add(ProfileImage(
+            hash=digest,
+            content_type=detect_image_content_type(data),
+            size=len(data),
+            data=data
+        ))
+        # Flush so a duplicate later in the same batch is found by db.get
+        db.flush()
+    return digest
+
+
+def migrate_profile_images(batch_size: int = 200, dry_run: bool = False) -> dict:
+    summary = {"migrated": 0, "deduplicated": 0, "invalid": 0}
+    last_id = 0
+    with SessionLocal() as db:
+        while True:
+            rows = db.execute(
+                select(User.id, User.profile_image)
+                .where(
+                    User.id > last_id,
+                    User.profile_image.is_not(None),
+                    User.profile_image_hash.is_(None)
+                )
+                .order_by(User.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            for user_id, encoded in rows:
+                last_id = user_id
+                try:
+                    data = decode_image_data(encoded)
+                except (binascii.Error, ValueError):
+                    summary["invalid"] += 1
+                    print(f"user {user_id}: invalid image data, left in place", file=sys.stderr)
+                    continue
+
+                if db.get(ProfileImage, hashlib.sha256(data).hexdigest()) is not None:
+                    summary["deduplicated"] += 1
+                digest = store_blob(db, data)
+
+                user = db.get(User, user_id)
+                user.profile_image_hash = digest
+                user.profile_image = None
+                summary["migrated"] += 1
+
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            # Release the batch's decoded images before the next one
+            db.expunge_all()
+    return summary
+
+
+def backfill_image_variants(batch_size: int = 50, dry_run: bool = False) -> int:
+    """Render resized variants for profile images uploaded before variants existed"""
+    rendered = 0
+    last_hash = ""
+    with SessionLocal() as db:
+        while True:
+            hashes = db.scalars(
+                select(User.profile_image_hash)
+                .where(
+                    User.profile_image_hash > last_hash,
+                    ~select(ProfileImageVariant.image_hash)
+                    .where(ProfileImageVariant.image_hash == User.profile_image_hash)
+                    .exists()
+                )
+                .distinct()
+                .order_by(User.profile_image_hash)
+                .limit(batch_size)
+            ).all()
+            if not hashes:
+                break
+
+            for image_hash in hashes:
+                last_hash = image_hash
+                image = db.get(ProfileImage, image_hash)
+                if image is None:
+                    continue
+                try:
+                    variants = render_image_variants(image.data)
+                except Exception as e:
+                    print(f"image {image_hash}: could not render variants ({e})", file=sys.stderr)
+                    continue
+                for size, fmt, data in variants:
+                    db.add(ProfileImageVariant(
+                        image_hash=image_hash,
+                        size=size,
+                        format=fmt,
+                        variant_hash=store_blob(db, data)
+                    ))
+                rendered += 1
+
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+            db.expunge_all()
+    return rendered
+
+
+def vacuum():
+    """VACUUM can't run inside a transaction, and the engine always opens one (BEGIN on
+    autobegin), so run it on the raw SQLite connection in autocommit mode"""
+    from main import engine
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.isolation_level = None
+        raw.driver_connection.execute("VACUUM")
+    finally:
+        raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move base64 profile images into the profile_images blob table")
+    parser.add_argument("--batch-size", type=int, default=200, help="users per transaction (default: 200)")
+    parser.add_argument("--dry-run", action="store_true", help="decode and hash images without writing")
+    parser.add_argument("--vacuum", action="store_true", help="run VACUUM afterwards to reclaim the freed space")
+    parser.add_argument("--variants", action="store_true", help="also render missing thumbnail/WebP variants")
+    args = parser.parse_args()
+
+    prepare_database()
+    summary = migrate_profile_images(args.batch_size, args.dry_run)
+    print(f"migrated={summary['migrated']} deduplicated={summary['deduplicated']} invalid={summary['invalid']}"
+          + (" (dry run)" if args.dry_run else ""))
+
+    if args.variants:
+        rendered = backfill_image_variants(dry_run=args.dry_run)
+        print(f"variants rendered for {rendered} images" + (" (dry run)" if args.dry_run else ""))
+
+    if args.vacuum and not args.dry_run:
+        vacuum()
+
+
+if __name__ == "__main__":
+    main()
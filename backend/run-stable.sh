@@ -21,7 +21,8 @@ pip install -r requirements.txt || {
     pip install "PyJWT>=2.8.0"
     pip install "passlib[bcrypt]>=1.7.4"
     pip install python-multipart>=0.0.6
-    pip install sqlalchemy>=2.0.23
+    pip install "sqlalchemy[asyncio]>=2.0.23"
+    pip install "aiosqlite>=0.19.0"
     pip install pillow>=10.0.0 || echo "Warning: Pillow installation failed, continuing without it"
     pip install email-validator>=2.0.0
 }
@@ -42,7 +43,8 @@ if [ "$GITHUB_ACTIONS" = "true" ] || [ "$CI" = "true" ]; then
 else
     echo "Running in local environment"
     # 로컬에서는 백그라운드 실행
-    nohup python3 main.py > server.log 2>&1 &
+    # 운영용 실행기: 마이그레이션 1회 후 워커 fork (WEB_CONCURRENCY로 워커 수 지정)
+    nohup python3 serve.py > server.log 2>&1 &
     SERVER_PID=$!
     echo "Backend server started with PID: $SERVER_PID"
     echo "Server logs are written to server.log"
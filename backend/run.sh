@@ -7,7 +7,7 @@ echo "Installing Python dependencies..."
 pip install --upgrade pip
 pip install -r requirements.txt || {
     echo "Warning: Some dependencies failed to install. Trying individual installation..."
-    pip install fastapi uvicorn "pydantic[email]" python-jose PyJWT passlib python-multipart sqlalchemy email-validator
+    pip install fastapi uvicorn "pydantic[email]" python-jose PyJWT passlib python-multipart "sqlalchemy[asyncio]" aiosqlite email-validator
 }
 
 echo "Starting backend server in background..."
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+프로덕션 서버 실행기
+
+DB 테이블 생성과 마이그레이션을 한 번만 실행한 뒤, 앱을 미리 import 해 둔 프로세스에서
+워커 N개를 fork 합니다. 워커는 하나의 리스닝 소켓을 공유하고, 죽은 워커는 다시 띄웁니다.
+
+    python serve.py                                # 워커 수 = CPU 코어 수, 0.0.0.0:8080
+    python serve.py --workers 4 --port 8080
+    WEB_CONCURRENCY=4 PORT=8080 python serve.py
+
+워커가 2개 이상이면 METRICS_DIR(지정하지 않으면 임시 디렉터리)과 MATCH_EVENT_BROKER=database 를
+기본으로 사용합니다. 처음 시작할 때 METRICS_DIR 의 이전 지표 파일을 지웁니다.
+
+시그널
+    SIGHUP          무중단 재시작. 새 코드를 별도 프로세스에서 import 하고 마이그레이션한 뒤
+                    실행기를 같은 PID 로 다시 실행해 새 워커를 띄우고, 새 워커가 모두 준비되면
+                    기존 워커를 정상 종료합니다. 새 코드가 실패하면 기존 워커를 그대로 둡니다.
+    SIGTERM/SIGINT  워커가 처리 중인 요청을 마치게 한 뒤 종료 (--graceful-timeout 초 후 강제 종료)
+"""
+
+import argparse
+import gc
+import os
+import select
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+import uvicorn
+
+STARTED = time.perf_counter()
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# Handed to the launcher re-executed by SIGHUP
+LISTEN_FD_ENV = "SERVE_LISTEN_FD"
+RETIRING_PIDS_ENV = "SERVE_RETIRING_PIDS"
+HANDLED_SIGNALS = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD)
+RESPAWN_DELAY_SECONDS = 1.0  # after a worker dies before it was ready
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that tells the launcher its pid once the app has started"""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, struct.pack("i", os.getpid()))
+
+
+class Launcher:
+    """Forks workers from the preloaded app, replaces the ones that die, and hands over to
+    a re-executed launcher on SIGHUP"""
+
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> ready
+        # Workers of the previous version, stopped once this version's are all ready
+        self.retiring = {int(pid) for pid in os.environ.pop(RETIRING_PIDS_ENV, "").split(",") if pid}
+        self.booted = False
+        self.ready_r, self.ready_w = os.pipe()
+        self.wakeup_r, self.wakeup_w = os.pipe()
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = False
+            return
+        code = 1
+        try:
+            signal.set_wakeup_fd(-1)
+            for sig in HANDLED_SIGNALS:
+                signal.signal(sig, signal.SIG_DFL)
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)  # reloads are the launcher's business
+            os.close(self.ready_r)
+            os.close(self.wakeup_r)
+            os.close(self.wakeup_w)
+            config = uvicorn.Config(self.app, log_level=self.args.log_level,
+                                    timeout_graceful_shutdown=self.args.graceful_timeout)
+            server = WorkerServer(config, self.ready_w)
+            server.run(sockets=[self.sock])
+            code = 0 if server.started else 3
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def run(self):
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, lambda signum, frame: None)
+        os.set_blocking(self.wakeup_w, False)
+        signal.set_wakeup_fd(self.wakeup_w)
+        for _ in range(self.args.workers):
+            self.spawn()
+        while True:
+            readable, _, _ = select.select([self.ready_r, self.wakeup_r], [], [], 1.0)
+            received = set(os.read(self.wakeup_r, 512)) if self.wakeup_r in readable else set()
+            if self.ready_r in readable:
+                self.mark_ready(os.read(self.ready_r, 4096))
+            if received & {signal.SIGTERM, signal.SIGINT}:
+                self.stop()
+                return
+            self.reap()
+            if signal.SIGHUP in received:
+                self.reload()
+
+    def mark_ready(self, data: bytes):
+        for (pid,) in struct.iter_unpack("i", data):
+            if pid in self.workers:
+                self.workers[pid] = True
+        if self.booted or len(self.workers) < self.args.workers or not all(self.workers.values()):
+            return
+        self.booted = True
+        print(f"{len(self.workers)} workers ready in {time.perf_counter() - STARTED:.2f}s")
+        if self.retiring:
+            print(f"Stopping {len(self.retiring)} workers of the previous version")
+            self.signal(self.retiring, signal.SIGTERM)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self.retiring.discard(pid)
+            ready = self.workers.pop(pid, None)
+            if ready is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if not self.booted:
+                self.boot_failed(pid, code)
+                return
+            print(f"Warning: worker {pid} exited with code {code}; starting a new one")
+            if not ready:
+                time.sleep(RESPAWN_DELAY_SECONDS)
+            self.spawn()
+
+    def boot_failed(self, pid: int, code: int):
+        print(f"Error: worker {pid} failed to start (exit code {code})")
+        self.signal(self.workers, signal.SIGTERM)
+        self.wait(set(self.workers))
+        if not self.retiring:
+            sys.exit(1)
+        # A reload whose workers can't start leaves the previous version serving
+        print(f"Keeping {len(self.retiring)} workers of the previous version")
+        self.workers = dict.fromkeys(self.retiring, True)
+        self.retiring = set()
+        self.booted = True
+
+    def reload(self):
+        # Import and migrate with the new code in a separate process first, so a broken
+        # deploy leaves the running workers alone
+        check = subprocess.run([sys.executable, "-c", "import main; main.prepare_database()"], cwd=BACKEND_DIR)
+        if check.returncode:
+            print("Error: reload aborted; the new code failed to load or migrate")
+            return
+        print("Reloading")
+        os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+        os.environ[RETIRING_PIDS_ENV] = ",".join(str(pid) for pid in set(self.workers) | self.retiring)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execv(sys.executable, [sys.executable, os.path.abspath(__file__)] + sys.argv[1:])
+
+    def stop(self):
+        pids = set(self.workers) | self.retiring
+        print(f"Stopping {len(pids)} workers")
+        self.signal(pids, signal.SIGTERM)
+        self.wait(pids, self.args.graceful_timeout + 5)
+        self.signal(pids, signal.SIGKILL)
+
+    def signal(self, pids, sig):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def wait(self, pids: set, timeout: float = None):
+        """Reap pids as they exit, until none is left or timeout passes; exited pids are removed"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while pids and (deadline is None or time.monotonic() < deadline):
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pids.clear()
+                return
+            if pid:
+                pids.discard(pid)
+                self.retiring.discard(pid)
+            else:
+                time.sleep(0.05)
+
+
+def prepare_environment(workers: int):
+    """Settings every worker must share; main.py reads them at import"""
+    if workers > 1:
+        # Each worker keeps its own metrics and event subscribers
+        if not os.environ.get("METRICS_DIR"):
+            os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="mentor-metrics-")
+        os.environ.setdefault("MATCH_EVENT_BROKER", "database")
+    directory = os.environ.get("METRICS_DIR")
+    if directory:
+        # Counters left by a previous deployment's workers would be summed forever
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.startswith("metrics-") and name.endswith((".json", ".json.tmp")):
+                os.remove(os.path.join(directory, name))
+
+
+def listening_socket(host: str, port: int) -> socket.socket:
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is not None:
+        sock = socket.socket(fileno=int(fd))
+    else:
+        sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="seconds a stopping worker may spend finishing requests (default: 30)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    if LISTEN_FD_ENV not in os.environ:
+        prepare_environment(args.workers)
+    sock = listening_socket(args.host, args.port)
+
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+
+    main.prepare_database()
+    # Workers open their own connections; SQLite connections must not cross a fork
+    main.engine.dispose()
+    print(f"Loaded the app in {time.perf_counter() - STARTED:.2f}s; "
+          f"starting {args.workers} workers on {args.host}:{args.port}")
+    # Everything loaded so far lives as long as the workers. Freezing it keeps the garbage
+    # collector from writing to those objects, so the pages stay shared after fork.
+    gc.collect()
+    gc.freeze()
+    Launcher(main.app, sock, args).run()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -9,7 +9,7 @@ const Profile: React.FC = () => {
   const [name, setName] = useState(user?.name || '');
   const [bio, setBio] = useState(user?.bio || '');
   const [skills, setSkills] = useState(user?.skills?.join(', ') || '');
-  const [image, setImage] = useState('');
+  const [imageFile, setImageFile] = useState<File | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const fileInputRef = useRef<HTMLInputElement>(null);
@@ -32,14 +32,8 @@ const Profile: React.FC = () => {
       return;
     }
 
-    const reader = new FileReader();
-    reader.onload = () => {
-      const result = reader.result as string;
-      const base64 = result.split(',')[1]; // Remove data:image/jpeg;base64, prefix
-      setImage(base64);
-      setError('');
-    };
-    reader.readAsDataURL(file);
+    setImageFile(file);
+    setError('');
   };
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -52,18 +46,23 @@ const Profile: React.FC = () => {
         ? skills.split(',').map((s: string) => s.trim()).filter((s: string) => s.length > 0)
         : undefined;
 
+      // The image goes up as a file first; the profile update then leaves it alone
+      if (imageFile) {
+        await userApi.uploadProfileImage(imageFile);
+      }
+
       const updatedUser = await userApi.updateProfile({
         id: user.id,
         name,
         role: user.role,
         bio,
-        image,
+        image: '',
         skills: skillsArray
       });
 
       updateUser(updatedUser);
       setEditing(false);
-      setImage('');
+      setImageFile(null);
     } catch (err: any) {
       setError(err.response?.data?.detail || '프로필 업데이트에 실패했습니다.');
     } finally {
@@ -75,7 +74,7 @@ const Profile: React.FC = () => {
     setName(user.name || '');
     setBio(user.bio || '');
     setSkills(user.skills?.join(', ') || '');
-    setImage('');
+    setImageFile(null);
     setEditing(false);
     setError('');
   };
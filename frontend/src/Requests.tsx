@@ -1,6 +1,6 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useAuth } from './AuthContext';
-import { matchRequestApi, MatchRequest, MatchRequestOutgoing } from './api';
+import { matchRequestApi, userApi, MatchRequest, MatchRequestOutgoing } from './api';
 import Navigation from './Navigation';
 
 const Requests: React.FC = () => {
@@ -10,6 +10,7 @@ const Requests: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [actionLoading, setActionLoading] = useState<number | null>(null);
+  const requestedProfiles = useRef(new Set<number>());
 
   const fetchRequests = useCallback(async () => {
     try {
@@ -34,6 +35,54 @@ const Requests: React.FC = () => {
     }
   }, [user, fetchRequests]);
 
+  useEffect(() => {
+    if (!user) {
+      return;
+    }
+    // Events carry no embedded profile, so keep the one the list already has
+    const upsert = <T extends MatchRequest>(list: T[], request: T): T[] =>
+      list.some((r) => r.id === request.id)
+        ? list.map((r) => (r.id === request.id ? { ...r, ...request } : r))
+        : [...list, request];
+
+    return matchRequestApi.subscribe(
+      (request) => {
+        if (user.role === 'mentor') {
+          setIncomingRequests((list) => upsert(list, request));
+        } else {
+          setOutgoingRequests((list) => upsert(list, request));
+        }
+      },
+      fetchRequests
+    );
+  }, [user, fetchRequests]);
+
+  // Requests that arrived over the event stream have no profile yet; look them up in one batch
+  useEffect(() => {
+    if (!user) {
+      return;
+    }
+    const isMentor = user.role === 'mentor';
+    const missing = isMentor
+      ? incomingRequests.filter((r) => !r.menteeProfile).map((r) => r.menteeId)
+      : outgoingRequests.filter((r) => !r.mentorProfile).map((r) => r.mentorId);
+    const ids = Array.from(new Set(missing)).filter((id) => !requestedProfiles.current.has(id));
+    if (ids.length === 0) {
+      return;
+    }
+    ids.forEach((id) => requestedProfiles.current.add(id));
+    userApi.getUsers(ids).then((users) => {
+      const profiles = new Map(users.map((u) => [u.id, u.profile]));
+      if (isMentor) {
+        setIncomingRequests((list) => list.map((r) =>
+          !r.menteeProfile && profiles.has(r.menteeId) ? { ...r, menteeProfile: profiles.get(r.menteeId) } : r));
+      } else {
+        setOutgoingRequests((list) => list.map((r) =>
+          !r.mentorProfile && profiles.has(r.mentorId) ? { ...r, mentorProfile: profiles.get(r.mentorId) } : r));
+      }
+    }).catch(() => {});
+  }, [user, incomingRequests, outgoingRequests]);
+
   const handleAccept = async (requestId: number) => {
     setActionLoading(requestId);
     try {
@@ -112,7 +161,7 @@ const Requests: React.FC = () => {
                     <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'flex-start', marginBottom: '15px' }}>
                       <div>
                         <h3 className="mentee-name" style={{ margin: '0 0 5px 0' }}>
-                          멘티 #{request.menteeId}
+                          {request.menteeProfile?.name || `멘티 #${request.menteeId}`}
                         </h3>
                       </div>
                       <div>
@@ -218,7 +267,7 @@ const Requests: React.FC = () => {
                     <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'flex-start', marginBottom: '15px' }}>
                       <div>
                         <h3 className="mentor-name" style={{ margin: '0 0 5px 0' }}>
-                          멘토 #{request.mentorId}
+                          {request.mentorProfile?.name || `멘토 #${request.mentorId}`}
                         </h3>
                       </div>
                       <div>
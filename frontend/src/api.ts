@@ -48,12 +48,27 @@ export interface Mentor extends User {
   role: 'mentor';
 }
 
+export interface ProfileDetails {
+  name: string;
+  bio: string;
+  imageUrl: string;
+  skills?: string[] | null;
+}
+
+export interface UserProfile {
+  id: number;
+  email: string;
+  role: string;
+  profile: ProfileDetails;
+}
+
 export interface MatchRequest {
   id: number;
   mentorId: number;
   menteeId: number;
   message: string;
   status: string;
+  menteeProfile?: ProfileDetails;
 }
 
 export interface MatchRequestOutgoing {
@@ -62,6 +77,7 @@ export interface MatchRequestOutgoing {
   menteeId: number;
   message: string;
   status: string;
+  mentorProfile?: ProfileDetails;
 }
 
 // API functions
@@ -95,9 +111,23 @@ export const userApi = {
     return response.data;
   },
 
+  // Sent as multipart so the server can stream it instead of decoding base64 JSON
+  uploadProfileImage: async (file: File): Promise<UserProfile> => {
+    const form = new FormData();
+    form.append('image', file);
+    const response = await api.put('/profile/image', form);
+    return response.data;
+  },
+
   getProfileImage: (role: string, id: number) => {
     return `${API_BASE_URL}/images/${role}/${id}`;
   },
+
+  // Many profiles in one request; ids the caller may not see are left out
+  getUsers: async (ids: number[]): Promise<UserProfile[]> => {
+    const response = await api.get(`/users?ids=${ids.join(',')}`);
+    return response.data;
+  },
 };
 
 export const mentorApi = {
@@ -127,12 +157,12 @@ export const matchRequestApi = {
   },
 
   getIncoming: async (): Promise<MatchRequest[]> => {
-    const response = await api.get('/match-requests/incoming');
+    const response = await api.get('/match-requests/incoming?embed=profile');
     return response.data;
   },
 
   getOutgoing: async (): Promise<MatchRequestOutgoing[]> => {
-    const response = await api.get('/match-requests/outgoing');
+    const response = await api.get('/match-requests/outgoing?embed=profile');
     return response.data;
   },
 
@@ -150,6 +180,20 @@ export const matchRequestApi = {
     const response = await api.delete(`/match-requests/${id}`);
     return response.data;
   },
+
+  // Server-Sent Events for changes to the user's requests; returns an unsubscribe function.
+  // EventSource can't send headers, so the token goes in the query string.
+  subscribe: (onChange: (request: MatchRequest) => void, onResync: () => void): (() => void) => {
+    const token = localStorage.getItem('token');
+    const source = new EventSource(
+      `${API_BASE_URL}/match-requests/stream?access_token=${encodeURIComponent(token || '')}`
+    );
+    source.addEventListener('match-request', (event) => {
+      onChange(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('resync', onResync);
+    return () => source.close();
+  },
 };
 
 export default api;
@@ -20,7 +20,7 @@ echo "  - Python 의존성 설치 중..."
 pip install --upgrade pip >/dev/null 2>&1
 pip install -r requirements.txt >/dev/null 2>&1 || {
     echo "  - 의존성 설치 실패, 개별 설치 시도 중..."
-    pip install fastapi uvicorn "pydantic[email]" python-jose PyJWT passlib python-multipart sqlalchemy email-validator pillow >/dev/null 2>&1
+    pip install fastapi uvicorn "pydantic[email]" python-jose PyJWT passlib python-multipart "sqlalchemy[asyncio]" aiosqlite email-validator pillow >/dev/null 2>&1
 }
 
 # 백엔드 서버 시작